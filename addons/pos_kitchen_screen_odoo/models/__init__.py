@@ -21,3 +21,9 @@
 ############################################################################
 from . import kitchen_screen
 from . import pos_status
+from . import pos_order_line
+from . import pos_order_tombstone
+from . import kitchen_ticket
+from . import pos_category
+from . import product_product
+from . import product_template
@@ -19,7 +19,18 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ############################################################################
+import uuid
+
 from odoo import api, fields, models
+from odoo.osv import expression
+from odoo.tools.lru import LRU
+
+# One row per transaction that changed the stations or the products they
+# show, see `_get_kitchen_catalog_version`
+KITCHEN_VERSION_TABLE = 'kitchen_catalog_version'
+
+# (dbname, config id) -> (kitchen catalog version, station routing)
+_station_routings = LRU(64)
 
 
 class KitchenScreen(models.Model):
@@ -29,14 +40,8 @@ class KitchenScreen(models.Model):
     _rec_name = 'sequence'
 
     def _pos_shop_id(self):
-        """Domain for the Pos Shop"""
-        kitchen = self.search([])
-        if kitchen:
-            return [('module_pos_restaurant', '=', True),
-                    (
-                    'id', 'not in', [rec.id for rec in kitchen.pos_config_id])]
-        else:
-            return [('module_pos_restaurant', '=', True)]
+        """Domain for the Pos Shop, a shop may have several stations"""
+        return [('module_pos_restaurant', '=', True)]
 
     sequence = fields.Char(readonly=True, default='New',
                            copy=False, tracking=True, help="Sequence of items")
@@ -64,6 +69,14 @@ class KitchenScreen(models.Model):
             'url': '/pos/kitchen?pos_config_id= %s' % self.pos_config_id.id,
         }
 
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {KITCHEN_VERSION_TABLE} (
+                id bigserial PRIMARY KEY,
+                create_date timestamp NOT NULL DEFAULT (now() at time zone 'UTC')
+            )
+        """)
+
     @api.model_create_multi
     def create(self, vals_list):
         """Used to create sequence"""
@@ -71,4 +84,142 @@ class KitchenScreen(models.Model):
             if vals.get('sequence', "New") == "New":
                 vals['sequence'] = self.env['ir.sequence'].next_by_code(
                     'kitchen.screen') or "New"
+        self._invalidate_kitchen_catalog()
         return super().create(vals_list)
+
+    def write(self, vals):
+        """Reset the station routing when stations change"""
+        self._invalidate_kitchen_catalog()
+        return super().write(vals)
+
+    def unlink(self):
+        """Reset the station routing when stations change"""
+        self._invalidate_kitchen_catalog()
+        return super().unlink()
+
+    @api.model
+    def _get_kitchen_catalog_version(self):
+        """Token of the stations and of the products they show, changing
+        with them.
+
+        It hashes the ids of the version rows the transaction sees, so the
+        routing and product names cached under it are those of exactly
+        the committed changes. A transaction with uncommitted changes gets
+        a token of its own, so what it computes is not served to others.
+        """
+        pending = self.env.cr.precommit.data.get(
+            'pos_kitchen_screen_odoo.catalog_invalidated')
+        if pending:
+            return pending
+        self.env.cr.execute(f"""
+            SELECT md5(string_agg(id::text, ',' ORDER BY id))
+              FROM {KITCHEN_VERSION_TABLE}
+        """)
+        return self.env.cr.fetchone()[0] or '0'
+
+    @api.model
+    def _invalidate_kitchen_catalog(self):
+        """Add a kitchen catalog version when the transaction commits,
+        dropping the routing and product names cached by every worker
+        and nothing else"""
+        data = self.env.cr.precommit.data
+        if not data.get('pos_kitchen_screen_odoo.catalog_invalidated'):
+            self.env.cr.precommit.add(self._bump_kitchen_catalog_version)
+        # a new token for every change, the transaction's own caches included
+        data['pos_kitchen_screen_odoo.catalog_invalidated'] = uuid.uuid4().hex
+
+    @api.model
+    def _bump_kitchen_catalog_version(self):
+        self.env.cr.execute(
+            f"INSERT INTO {KITCHEN_VERSION_TABLE} DEFAULT VALUES")
+
+    @api.autovacuum
+    def _gc_kitchen_catalog_versions(self):
+        """Drop the versions older than a day but the last one, committed
+        before any newer one so the remaining ids still hash differently"""
+        self.env.cr.execute(f"""
+            DELETE FROM {KITCHEN_VERSION_TABLE}
+             WHERE create_date < (now() at time zone 'UTC') - interval '1 day'
+               AND id < (SELECT max(id) FROM {KITCHEN_VERSION_TABLE})
+        """)
+
+    @api.model
+    def _get_station_routing(self, config_id):
+        """Routing of `_compute_station_routing`, kept by each worker until
+        the kitchen catalog version changes"""
+        key = (self.env.cr.dbname, config_id)
+        version = self._get_kitchen_catalog_version()
+        cached = _station_routings.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        routing = self._compute_station_routing(config_id)
+        _station_routings[key] = (version, routing)
+        return routing
+
+    @api.model
+    def _compute_station_routing(self, config_id):
+        """Precomputed routing of the products of a pos to its stations.
+
+        Returns a `(product_stations, catchall)` pair: product id -> ids of
+        the screens showing one of its categories or their subcategories,
+        and the ids of the screens without categories, which show every
+        product.
+        """
+        screens = self.sudo().search([('pos_config_id', '=', config_id)])
+        catchall = tuple(screens.filtered(lambda s: not s.pos_categ_ids).ids)
+        screens_by_categ = {}
+        for screen in screens:
+            for categ_id in screen._get_routed_categ_ids():
+                screens_by_categ.setdefault(categ_id, []).append(screen.id)
+
+        product_stations = {}
+        if screens_by_categ:
+            products = self.env['product.product'].sudo().with_context(
+                active_test=False).search_read(
+                [('pos_categ_ids', 'in', list(screens_by_categ))],
+                ['pos_categ_ids'])
+            for product in products:
+                product_stations[product['id']] = tuple(sorted({
+                    screen_id
+                    for categ_id in product['pos_categ_ids']
+                    for screen_id in screens_by_categ.get(categ_id, ())
+                }))
+        return product_stations, catchall
+
+    @api.model
+    def _route_products(self, config_id, product_ids):
+        """Map each product to the screens that show it, or to `(False,)`
+        when no screen of the pos does"""
+        product_stations, catchall = self._get_station_routing(config_id)
+        return {
+            product_id: product_stations.get(product_id, ()) + catchall
+            or (False,)
+            for product_id in product_ids
+        }
+
+    def _get_routed_categ_ids(self):
+        """Ids of the categories of the screens and of their subcategories"""
+        if not self.pos_categ_ids:
+            return []
+        return self.env['pos.category'].sudo().search(
+            [('id', 'child_of', self.pos_categ_ids.ids)]).ids
+
+    def _get_line_domain(self):
+        """Domain of the order lines shown on this screen, by the rule of
+        `_route_products`: the lines of the products in its categories,
+        and of the products no screen of the pos shows, or every line for
+        a screen without categories"""
+        self.ensure_one()
+        if not self.pos_categ_ids:
+            return []
+        domain = [('product_id.pos_categ_ids', 'in',
+                   self._get_routed_categ_ids())]
+        screens = self.sudo().search(
+            [('pos_config_id', '=', self.pos_config_id.id)])
+        if not all(screen.pos_categ_ids for screen in screens):
+            # the other products go to the screens without categories
+            return domain
+        return expression.OR([domain, [
+            ('product_id.pos_categ_ids', 'not in',
+             screens._get_routed_categ_ids()),
+        ]])
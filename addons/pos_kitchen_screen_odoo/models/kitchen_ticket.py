@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+import hashlib
+import re
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools.lru import LRU
+from odoo.tools.sql import create_index
+
+_ORDER_PREFIX = re.compile(r'^\s*Order\s*', re.IGNORECASE)
+
+# (dbname, lang) -> (kitchen catalog version, (dictionary version, names))
+_product_dictionaries = LRU(16)
+
+
+def normalize_pos_reference(reference):
+    """Strip the leading "Order" the POS puts in front of references"""
+    if reference is None:
+        return ''
+    return _ORDER_PREFIX.sub('', str(reference).strip(), count=1).strip()
+
+
+class KitchenTicket(models.Model):
+    """Ticket shown on the kitchen screen, holding only the lines that
+    changed since the previous ticket of the same order"""
+    _name = 'kitchen.ticket'
+    _description = 'Kitchen Ticket'
+    _order = 'id'
+
+    config_id = fields.Many2one('pos.config', string='Pos Config',
+                                required=True, index=True,
+                                ondelete='cascade',
+                                help="Pos the order was taken on")
+    screen_id = fields.Many2one('kitchen.screen', string='Kitchen Station',
+                                index=True, ondelete='set null',
+                                help="Station the ticket is routed to, empty "
+                                     "when no station shows its products")
+    pos_reference = fields.Char(string='Order Reference', index=True,
+                                help="Reference of the order as sent by "
+                                     "the POS")
+    date_order = fields.Char(string='Order Date',
+                             help="Date of the order as sent by the POS")
+    table = fields.Char(string='Table', help="Table of the order")
+    floor = fields.Char(string='Floor', help="Floor of the table")
+    state = fields.Selection(
+        selection=[('draft', 'Cooking'), ('completed', 'Completed')],
+        string='Stage', default='draft', required=True,
+        help="Cooking stage of the ticket")
+    line_ids = fields.One2many('kitchen.ticket.line', 'ticket_id',
+                               string='Lines', help="Changed lines")
+
+    def init(self):
+        """Index the recent tickets of a pos, loaded by `get_tickets`"""
+        super().init()
+        create_index(self.env.cr, 'kitchen_ticket_config_create_date_index',
+                     self._table, ['config_id', 'create_date'])
+
+    @api.model
+    def push_order(self, message):
+        """RPC called from the POS when an order is sent in preparation.
+
+        message: order dict as built by `sendOrderInPreparation`
+        """
+        ticket_ids = self.push_orders([message])['ticket_ids']
+        return {'success': True, 'ticket_id': ticket_ids[0] if ticket_ids else False}
+
+    @api.model
+    def push_orders(self, messages):
+        """Batch variant of `push_order`.
+
+        Messages about the same order are coalesced to the latest one, the
+        resulting tickets are created in one transaction and published with
+        a single `_sendmany`.
+        """
+        latest = {}
+        for message in messages:
+            key = (message.get('config_id'),
+                   normalize_pos_reference(message.get('pos_reference')))
+            latest.pop(key, None)
+            latest[key] = message
+
+        tickets = self.sudo().browse()
+        for message in latest.values():
+            tickets |= tickets._process_order_message(message)
+        self.env['bus.bus'].sudo()._sendmany([
+            (self._get_kitchen_channel(payload), 'notification', payload)
+            for payload in tickets._get_kitchen_payload()
+        ])
+        return {'success': True, 'ticket_ids': tickets.ids}
+
+    @api.model
+    def _process_order_message(self, message):
+        """Diff an order message against the running totals of its order.
+
+        Runs in O(lines in the message + products of the order): the
+        previous quantities are read from the single `kitchen.ticket.total`
+        row of the order instead of re-aggregating every past ticket.
+        The changed lines are split into one ticket per kitchen station
+        showing their products. Returns the created tickets, empty when
+        nothing changed.
+        """
+        config_id = message.get('config_id')
+        pos_reference = message.get('pos_reference')
+        if not config_id or pos_reference is None:
+            return self.browse()
+
+        total = self.env['kitchen.ticket.total']._lock_total(
+            config_id, normalize_pos_reference(pos_reference))
+        previous = {int(pid): vals for pid, vals in (total.totals or {}).items()}
+
+        current = {}
+        for line in message.get('lines') or []:
+            pid = line.get('product_id')
+            if not pid:
+                continue
+            entry = current.setdefault(pid, {'qty': 0.0, 'name': ''})
+            entry['qty'] += float(line.get('qty') or 0)
+            entry['name'] = line.get('product_name') or entry['name']
+
+        line_vals = []
+        for pid in [*current, *(pid for pid in previous if pid not in current)]:
+            prev_entry = previous.get(pid, {})
+            new_entry = current.get(pid, {})
+            prev_qty = prev_entry.get('qty', 0.0)
+            new_qty = new_entry.get('qty', 0.0)
+            if new_qty == prev_qty:
+                continue
+            line_vals.append({
+                'product_id': pid,
+                'product_name': new_entry.get('name') or prev_entry.get('name') or '',
+                'qty': abs(new_qty - prev_qty),
+                'is_cancelled': new_qty < prev_qty,
+            })
+        # compact messages carry no names: read only the products at hand
+        unnamed = [vals for vals in line_vals if not vals['product_name']]
+        if unnamed:
+            names = {
+                product['id']: product['display_name']
+                for product in self.env['product.product'].sudo().browse(
+                    [vals['product_id'] for vals in unnamed]).exists().read(['display_name'])
+            }
+            for vals in unnamed:
+                vals['product_name'] = names.get(vals['product_id'], '')
+
+        for pid, entry in current.items():
+            entry['name'] = entry['name'] or previous.get(pid, {}).get('name', '')
+        total.totals = {str(pid): entry for pid, entry in current.items() if entry['qty']}
+
+        if not line_vals:
+            return self.browse()
+        routes = self.env['kitchen.screen']._route_products(
+            config_id, [vals['product_id'] for vals in line_vals])
+        lines_by_screen = {}
+        for vals in line_vals:
+            for screen_id in routes[vals['product_id']]:
+                lines_by_screen.setdefault(screen_id, []).append(vals)
+        return self.create([{
+            'config_id': config_id,
+            'screen_id': screen_id,
+            'pos_reference': pos_reference,
+            'date_order': message.get('date_order'),
+            'table': message.get('table') or '',
+            'floor': message.get('floor') or '',
+            'line_ids': [fields.Command.create(vals) for vals in lines],
+        } for screen_id, lines in lines_by_screen.items()])
+
+    @api.model
+    def get_tickets(self, config_id, screen_id=None):
+        """Tickets of the last day for a kitchen screen (re)load: those of
+        its station and those no station shows"""
+        since = fields.Datetime.now() - timedelta(days=1)
+        domain = [
+            ('config_id', '=', int(config_id or 0)),
+            ('create_date', '>=', since),
+        ]
+        if screen_id:
+            domain.append(('screen_id', 'in', [int(screen_id), False]))
+        return self.search(domain)._get_kitchen_payload()
+
+    @api.model
+    def complete_ticket(self, ticket_id):
+        """Move a ticket to the completed stage"""
+        ticket = self.browse(int(ticket_id)).exists()
+        ticket.write({'state': 'completed'})
+        return {'success': bool(ticket), 'ticket_id': ticket.id}
+
+    def _get_kitchen_payload(self):
+        """Serialize tickets the way the kitchen screen displays them"""
+        _version, names = self._get_product_dictionary(self.env.lang)
+        return [{
+            'kitchen_order_id': ticket.id,
+            'config_id': ticket.config_id.id,
+            'screen_id': ticket.screen_id.id,
+            'pos_reference': ticket.pos_reference,
+            'date_order': ticket.date_order,
+            'from': 'waiter',
+            'state': ticket.state,
+            'floor': ticket.floor,
+            'table': ticket.table,
+            # [product id, quantity, cancelled], the names are resolved by
+            # the kitchen from `get_product_dictionary`, the stored name is
+            # appended for the products missing from it
+            'lines': [
+                [line.product_id.id, line.qty, int(line.is_cancelled)]
+                if line.product_id.id in names else
+                [line.product_id.id, line.qty, int(line.is_cancelled),
+                 line.product_name]
+                for line in ticket.line_ids
+            ],
+        } for ticket in self]
+
+    @api.model
+    def get_product_dictionary(self, known_version=None):
+        """Names of the products sold in POS, for the kitchen to resolve
+        the product ids of the tickets. Only the version is returned when
+        the client already has it."""
+        version, names = self._get_product_dictionary(self.env.lang)
+        if known_version == version:
+            return {'version': version, 'not_modified': True}
+        return {'version': version, 'products': names}
+
+    @api.model
+    def _get_product_dictionary(self, lang):
+        """Return `(version, {product id: name})` for the products sold in
+        POS, the version changing with the names. Kept by each worker until
+        the kitchen catalog version changes."""
+        key = (self.env.cr.dbname, lang)
+        catalog_version = self.env['kitchen.screen']._get_kitchen_catalog_version()
+        cached = _product_dictionaries.get(key)
+        if cached and cached[0] == catalog_version:
+            return cached[1]
+        dictionary = self._compute_product_dictionary(lang)
+        _product_dictionaries[key] = (catalog_version, dictionary)
+        return dictionary
+
+    @api.model
+    def _compute_product_dictionary(self, lang):
+        products = self.env['product.product'].sudo().with_context(
+            lang=lang).search_read([('available_in_pos', '=', True)],
+                                   ['display_name'], order='id')
+        names = {product['id']: product['display_name'] for product in products}
+        version = hashlib.sha1(
+            repr(sorted(names.items())).encode()).hexdigest()[:12]
+        return version, names
+
+    @api.model
+    def _get_kitchen_channel(self, payload):
+        """Bus channel of a ticket: its station's, or the channel all the
+        kitchen screens of the pos listen to"""
+        if payload['screen_id']:
+            return f'kitchen-station-{payload["screen_id"]}'
+        return f'waiter-{payload["config_id"]}'
+
+    @api.autovacuum
+    def _gc_tickets(self):
+        """Old tickets are no longer shown on any screen"""
+        limit = fields.Datetime.now() - timedelta(days=7)
+        self.search([('create_date', '<', limit)]).unlink()
+
+
+class KitchenTicketLine(models.Model):
+    """Quantity of a product added to or cancelled from an order"""
+    _name = 'kitchen.ticket.line'
+    _description = 'Kitchen Ticket Line'
+
+    ticket_id = fields.Many2one('kitchen.ticket', string='Ticket',
+                                required=True, index=True,
+                                ondelete='cascade',
+                                help="Ticket of the line")
+    product_id = fields.Many2one('product.product', string='Product',
+                                 help="Product to prepare")
+    product_name = fields.Char(string='Product Name',
+                               help="Name of the product when ordered")
+    qty = fields.Float(string='Quantity', help="Quantity added or cancelled")
+    is_cancelled = fields.Boolean(string='Cancelled',
+                                  help="The quantity was removed from the "
+                                       "order")
+
+
+class KitchenTicketTotal(models.Model):
+    """Running quantity per product of an order, as of its last ticket"""
+    _name = 'kitchen.ticket.total'
+    _description = 'Kitchen Ticket Running Total'
+
+    config_id = fields.Many2one('pos.config', string='Pos Config',
+                                required=True, ondelete='cascade',
+                                help="Pos the order was taken on")
+    pos_reference = fields.Char(string='Order Reference', required=True,
+                                help="Normalized reference of the order")
+    totals = fields.Json(string='Totals',
+                         help="Product id -> {'qty', 'name'} sent so far")
+
+    _sql_constraints = [
+        ('config_reference_uniq', 'unique(config_id, pos_reference)',
+         'Running totals must be unique per order.'),
+    ]
+
+    @api.model
+    def _lock_total(self, config_id, pos_reference):
+        """Return the row of the order, locked against concurrent pushes.
+
+        The row is inserted if missing with ON CONFLICT DO NOTHING, so two
+        first pushes of an order do not violate the unique constraint: the
+        second one waits for the first, then fails with a serialization
+        error that the RPC layer retries, instead of an integrity error.
+        """
+        now = self.env.cr.now()
+        self.env.cr.execute("""
+            INSERT INTO kitchen_ticket_total
+                   (config_id, pos_reference, create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (config_id, pos_reference) DO NOTHING
+        """, [config_id, pos_reference, self.env.uid, now, self.env.uid, now])
+        self.env.cr.execute("""
+            SELECT id FROM kitchen_ticket_total
+             WHERE config_id = %s AND pos_reference = %s
+               FOR NO KEY UPDATE
+        """, [config_id, pos_reference])
+        total = self.browse(self.env.cr.fetchone()[0])
+        total.invalidate_recordset(['totals'])
+        return total
+
+    @api.autovacuum
+    def _gc_totals(self):
+        """Orders are not sent to the kitchen anymore after a week"""
+        limit = fields.Datetime.now() - timedelta(days=7)
+        self.search([('write_date', '<', limit)]).unlink()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from odoo import models
+
+
+class PosCategory(models.Model):
+    """Reset the kitchen station routing when the category tree changes,
+    stations show the subcategories of their categories"""
+    _inherit = 'pos.category'
+
+    def write(self, vals):
+        """Route the products of moved categories to their new stations"""
+        if 'parent_id' in vals:
+            self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return super().write(vals)
+
+    def unlink(self):
+        """Route the products of deleted categories again"""
+        self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return super().unlink()
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from odoo import models
+from odoo.tools.sql import create_index
+
+
+class PosOrderLine(models.Model):
+    """Index the lines changed recently, for incremental kitchen syncs"""
+    _inherit = 'pos.order.line'
+
+    def init(self):
+        """Index the lines by write date, so `get_details_since` finds
+        the orders of the changed lines without scanning all lines"""
+        super().init()
+        create_index(self.env.cr, 'pos_order_line_kitchen_sync_index',
+                     self._table, ['write_date', 'order_id'])
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class PosOrderTombstone(models.Model):
+    """Trace of a deleted pos order, so kitchen screens syncing
+    incrementally learn about orders that no longer exist"""
+    _name = 'pos.order.tombstone'
+    _description = 'Deleted Pos Order'
+    _order = 'id'
+
+    order_id = fields.Integer(string='Order ID', required=True,
+                              help="Id of the deleted pos order")
+    config_id = fields.Many2one('pos.config', string='Pos Config',
+                                index=True, ondelete='cascade',
+                                help="Pos of the deleted order")
+
+    @api.autovacuum
+    def _gc_tombstones(self):
+        """Tombstones only matter to screens that synced recently"""
+        limit = fields.Datetime.now() - timedelta(days=1)
+        self.search([('create_date', '<', limit)]).unlink()
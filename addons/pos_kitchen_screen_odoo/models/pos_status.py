@@ -1,16 +1,42 @@
+import contextlib
+from collections import defaultdict
+from datetime import timedelta
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 from odoo import api, models
+from odoo.tools.sql import create_index
 
+try:
+    # optional, records the kitchen RPCs with the menu API metrics
+    from odoo.addons.pos_restaurant_api.metrics import instrument, stage
+except ImportError:
+    def instrument(endpoint):
+        return lambda func: func
 
+    def stage(name):
+        return contextlib.nullcontext()
 
+# Safety margin applied to kitchen sync cursors, see get_details_since
+KITCHEN_SYNC_OVERLAP = timedelta(seconds=10)
+# Orders older than this are history and no longer loaded by the kitchen
+KITCHEN_ACTIVE_WINDOW = timedelta(days=1)
 
 
 class PosOrder(models.Model):
     _inherit = "pos.order"
 
+    def init(self):
+        """Index the kitchen access paths, so kitchen loads stay flat as
+        the order history grows"""
+        super().init()
+        create_index(self.env.cr, 'pos_order_kitchen_date_index',
+                     self._table, ['config_id', 'date_order DESC'])
+        create_index(self.env.cr, 'pos_order_kitchen_sync_index',
+                     self._table, ['config_id', 'write_date'])
 
     @api.model
+    @instrument('pos.order.broadcast_order_update')
     def broadcast_order_update(self, channel, payload):
         """RPC called from the client to broadcast a payload on a bus channel.
 
@@ -26,6 +52,41 @@ class PosOrder(models.Model):
             return {'success': False, 'error': str(e)}
 
 
+    @api.model
+    @instrument('pos.order.broadcast_order_updates')
+    def broadcast_order_updates(self, messages, coalesce=False):
+        """Batch variant of `broadcast_order_update`, published with a
+        single `_sendmany` in one transaction.
+
+        messages: list of [channel, payload] pairs
+        coalesce: keep only the latest payload per channel and
+                  `pos_reference`, dropping intermediate states
+        """
+        try:
+            notifications = [(channel, 'notification', payload)
+                             for channel, payload in messages]
+            if coalesce:
+                notifications = self._coalesce_notifications(notifications)
+            self.env['bus.bus'].sudo()._sendmany(notifications)
+            return {'success': True, 'sent': len(notifications)}
+        except Exception as e:
+
+            return {'success': False, 'error': str(e)}
+
+    @api.model
+    def _coalesce_notifications(self, notifications):
+        """Collapse notifications about the same order to the latest one,
+        keeping them in the order the latest states arrived."""
+        latest = {}
+        for index, notification in enumerate(notifications):
+            channel, payload = notification[0], notification[2]
+            reference = isinstance(payload, dict) and payload.get('pos_reference')
+            key = (channel, reference) if reference else index
+            latest.pop(key, None)
+            latest[key] = notification
+        return list(latest.values())
+
+
     order_status = fields.Selection(
         selection=[
             ('draft', 'Cooking'),
@@ -39,65 +100,193 @@ class PosOrder(models.Model):
     )
 
     @api.model
-    def get_details(self, shop_id):
+    @instrument('pos.order.get_details')
+    def get_details(self, shop_id, screen_id=None):
         """Return orders and their lines for the kitchen screen.
         Each order dict will include a `lines` key (list), so the frontend
         can safely iterate `order.lines`.
+        With a `screen_id`, only the lines routed to that kitchen station
+        are returned.
+        Only active orders, taken within `KITCHEN_ACTIVE_WINDOW`, are
+        loaded; older ones are available through `get_history`.
         """
         shop_id = int(shop_id or 0)
-        domain = [('config_id', '=', shop_id), ('state', '!=', 'cancel')]
-        orders = self.search(domain, order='date_order desc', limit=500)
+        domain = [
+            ('config_id', '=', shop_id),
+            ('state', '!=', 'cancel'),
+            ('date_order', '>=', fields.Datetime.now() - KITCHEN_ACTIVE_WINDOW),
+        ]
+        return self._read_kitchen_orders(domain, screen_id=screen_id,
+                                         order='date_order desc', limit=500)
 
-        orders_data = []
+    @api.model
+    @instrument('pos.order.get_history')
+    def get_history(self, shop_id, offset=0, limit=80, date_from=None,
+                    date_to=None, screen_id=None):
+        """Return a page of past kitchen orders, newest first, in the
+        `get_details` format plus a `has_more` flag."""
+        domain = [('config_id', '=', int(shop_id or 0)),
+                  ('state', '!=', 'cancel')]
+        if date_from:
+            domain.append(('date_order', '>=', date_from))
+        if date_to:
+            domain.append(('date_order', '<', date_to))
+        order_ids = self.search(domain, order='date_order desc',
+                                offset=offset, limit=limit + 1).ids
+        result = self._read_kitchen_orders(
+            [('id', 'in', order_ids[:limit])], screen_id=screen_id,
+            order='date_order desc')
+        result['has_more'] = len(order_ids) > limit
+        return result
+
+    @api.model
+    @instrument('pos.order.get_details_since')
+    def get_details_since(self, shop_id, cursor=None, screen_id=None):
+        """Return only the kitchen orders changed since `cursor`.
+
+        Orders created, modified or with modified lines since the cursor are
+        returned in the same shape as `get_details`, cancelled and deleted
+        ones in `removed_order_ids`, along with the `cursor` to send on the
+        next call. Without cursor, this is a full `get_details` load.
+
+        The cursor is the transaction timestamp, and a transaction committing
+        after a concurrent poll may carry an older `write_date`, so changes are
+        looked up with a small overlap; clients must apply them idempotently.
+        """
+        shop_id = int(shop_id or 0)
+        new_cursor = fields.Datetime.to_string(self.env.cr.now())
+        if not cursor:
+            result = self.get_details(shop_id, screen_id=screen_id)
+            result.update(removed_order_ids=[], cursor=new_cursor)
+            return result
+
+        since = fields.Datetime.to_datetime(cursor) - KITCHEN_SYNC_OVERLAP
+        # Look up the orders of the changed lines first: an OR with a
+        # subquery on the lines cannot use the indexes and scans them all
+        line_order_ids = [order.id for order, in self.env['pos.order.line']._read_group(
+            [('write_date', '>=', since)], ['order_id'])]
+        domain = [
+            ('config_id', '=', shop_id),
+            '|', ('write_date', '>=', since), ('id', 'in', line_order_ids),
+        ]
+        result = self._read_kitchen_orders(
+            domain + [('state', '!=', 'cancel')], screen_id=screen_id,
+            order='date_order desc')
+        cancelled = self.search(domain + [('state', '=', 'cancel')])
+        deleted = self.env['pos.order.tombstone'].sudo().search_read(
+            [('config_id', '=', shop_id), ('create_date', '>=', since)],
+            ['order_id'])
+        result.update(
+            removed_order_ids=cancelled.ids + [t['order_id'] for t in deleted],
+            cursor=new_cursor,
+        )
+        return result
+
+    @api.model
+    def _read_kitchen_orders(self, domain, screen_id=None, **kwargs):
+        """Read the orders matching `domain` with their lines in bulk.
+
+        Orders and lines are fetched with explicit field lists and the names
+        of the distinct products, tables and configs are looked up once, so
+        the number of queries does not depend on the number of orders.
+        With a `screen_id`, only the lines of the products routed to that
+        kitchen station are kept, and the orders left without lines are
+        left out.
+        Extra keyword arguments are passed to `search_read` of the orders.
+        """
+        # archived products still route their lines, as in `_route_products`
+        Line = self.env['pos.order.line'].with_context(active_test=False)
+        Table = self.env['restaurant.table']
+        # Resolve field name fallbacks once instead of once per line
+        qty_field = next((f for f in ('qty', 'quantity', 'product_uom_qty') if f in Line._fields), None)
+        note_field = next((f for f in ('note', 'description') if f in Line._fields), None)
+        table_field = next((f for f in ('name', 'table_number') if f in Table._fields), 'display_name')
+
+        with stage('orders'):
+            orders = self.search_read(
+                domain,
+                ['name', 'date_order', 'order_status', 'state', 'table_id', 'config_id'],
+                load=None,
+                **kwargs,
+            )
+        line_domain = [('order_id', 'in', [o['id'] for o in orders])]
+        screen = self.env['kitchen.screen'].browse(int(screen_id or 0)).exists()
+        if screen:
+            line_domain += screen._get_line_domain()
+        with stage('lines'):
+            lines = Line.search_read(
+                line_domain,
+                ['order_id', 'product_id', 'price_unit'] + [f for f in (qty_field, note_field) if f],
+                load=None,
+                order='id',
+            )
+
+        with stage('names'):
+            product_names = self._kitchen_names(
+                self.env['product.product'], {line['product_id'] for line in lines}, 'display_name')
+            table_names = self._kitchen_names(
+                Table, {o['table_id'] for o in orders}, table_field)
+            config_names = self._kitchen_names(
+                self.env['pos.config'], {o['config_id'] for o in orders}, 'name')
+
+        lines_by_order = defaultdict(list)
         lines_data = []
+        for line in lines:
+            product_id = line['product_id']
+            line_item = {
+                'id': line['id'],
+                'order_id': line['order_id'],
+                'product_id': [product_id, product_names[product_id]] if product_id else False,
+                'qty': (line[qty_field] if qty_field else 0) or 0,
+                'price_unit': line['price_unit'] or 0,
+                'note': (line[note_field] if note_field else '') or '',
+            }
+            lines_by_order[line['order_id']].append(line_item)
+            lines_data.append(line_item)
 
+        orders_data = []
         for order in orders:
-            # Find line records (POS uses either 'lines' or 'order_line' historically)
-            order_lines = order.lines or getattr(order, 'order_line', self.env['pos.order.line'].browse())
-
-            # Build per-order lines list and also append to a flat list
-            order_lines_list = []
-            for line in order_lines:
-                prod = getattr(line, 'product_id', None)
-                prod_pair = [prod.id, prod.display_name] if prod else False
-
-                qty = (
-                    getattr(line, 'qty', None)
-                    or getattr(line, 'quantity', None)
-                    or getattr(line, 'product_uom_qty', None)
-                    or 0
-                )
-                note = (getattr(line, 'note', None) or getattr(line, 'description', '') or '')
-
-                line_item = {
-                    'id': line.id,
-                    'order_id': order.id,
-                    'product_id': prod_pair,
-                    'qty': qty,
-                    'price_unit': getattr(line, 'price_unit', 0),
-                    'note': note,
-                }
-
-                order_lines_list.append(line_item)
-                lines_data.append(line_item)
-
+            if screen and not lines_by_order[order['id']]:
+                continue
+            table_id = order['table_id']
+            config_id = order['config_id']
             orders_data.append({
-                'id': order.id,
-                'name': order.name,
-                'date_order': order.date_order,
-                'order_status': getattr(order, 'order_status', False),
-                'state': order.state,
-                'table_id': [order.table_id.id, getattr(order.table_id, 'name', False)] if order.table_id else False,
-                'config_id': [order.config_id.id, getattr(order.config_id, 'name', False)] if order.config_id else False,
+                'id': order['id'],
+                'name': order['name'],
+                'date_order': order['date_order'],
+                'order_status': order['order_status'],
+                'state': order['state'],
+                'table_id': [table_id, table_names[table_id]] if table_id else False,
+                'config_id': [config_id, config_names[config_id]] if config_id else False,
                 # Crucial: include lines inside the order
-                'lines': order_lines_list,
+                'lines': lines_by_order[order['id']],
             })
 
         # Ensure we always return lists (never None)
-        return {'orders': orders_data or [], 'order_lines': lines_data or []}
+        return {'orders': orders_data, 'order_lines': lines_data}
+
+    @api.model
+    def _kitchen_names(self, model, ids, field_name):
+        """Map the given record ids to the value of `field_name` in one read."""
+        ids = [record_id for record_id in ids if record_id]
+        if not ids:
+            return {}
+        return {
+            vals['id']: vals[field_name]
+            for vals in model.browse(ids).read([field_name])
+        }
 
 
+    def unlink(self):
+        """Leave a tombstone so incremental kitchen syncs drop the orders"""
+        self.env['pos.order.tombstone'].sudo().create([{
+            'order_id': order.id,
+            'config_id': order.config_id.id,
+        } for order in self])
+        return super().unlink()
+
     @api.model
+    @instrument('pos.order.update_order_status')
     def update_order_status(self, order_id, new_status):
         """Update order status from JS via /web/dataset/call_kw."""
         # use sudo() only if your ACLs require it
@@ -118,3 +307,61 @@ class PosOrder(models.Model):
             'order_id': order.id,
             'new_status': order.order_status,
         }
+
+    @api.model
+    @instrument('pos.order.update_order_statuses')
+    def update_order_statuses(self, transitions):
+        """Apply many order status transitions in one call.
+
+        transitions: list of [order_id, expected_status, new_status]
+
+        Each transition is a compare-and-set: the orders are locked row by
+        row and a transition only applies if the order is still in
+        `expected_status`, so a stale kitchen screen cannot overwrite a
+        change made by another one. Rows are locked by increasing id, so
+        screens bumping overlapping orders cannot deadlock. Valid
+        transitions are saved with one `write` per target status. Returns
+        the result of every transition.
+        """
+        self = self.sudo()
+        allowed = dict(self._fields['order_status'].selection)
+
+        order_ids = {int(transition[0]) for transition in transitions}
+        current = {}
+        if order_ids:
+            self.flush_model(['order_status'])
+            self.env.cr.execute("""
+                SELECT id, order_status FROM pos_order
+                 WHERE id IN %s
+                 ORDER BY id
+                   FOR NO KEY UPDATE
+            """, [tuple(order_ids)])
+            current = dict(self.env.cr.fetchall())
+
+        results = []
+        final = {}
+        for order_id, expected_status, new_status in transitions:
+            order_id = int(order_id)
+            result = {'order_id': order_id, 'new_status': new_status, 'success': False}
+            if new_status not in allowed:
+                result['error'] = _("Invalid status: %s") % new_status
+            elif order_id not in current:
+                result['error'] = _("Order not found: %s") % order_id
+            elif current[order_id] != expected_status:
+                result['error'] = _("Order status changed meanwhile")
+                result['current_status'] = current[order_id]
+            else:
+                result['success'] = True
+                current[order_id] = final[order_id] = new_status
+            results.append(result)
+
+        by_status = defaultdict(list)
+        for order_id, new_status in final.items():
+            by_status[new_status].append(order_id)
+        for new_status, ids in by_status.items():
+            self.browse(ids).write({'order_status': new_status})
+
+        return {
+            'success': all(result['success'] for result in results),
+            'results': results,
+        }
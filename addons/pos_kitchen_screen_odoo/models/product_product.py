@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from odoo import api, models
+
+
+# Fields of the variants the kitchen product dictionary depends on
+KITCHEN_VARIANT_FIELDS = {'default_code', 'active'}
+
+
+class ProductProduct(models.Model):
+    """Reset the kitchen station routing and product dictionary when the
+    variants sold in POS change"""
+    _inherit = 'product.product'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Route new products sold in POS to their stations"""
+        products = super().create(vals_list)
+        if any(product.available_in_pos or product.pos_categ_ids
+               for product in products):
+            self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return products
+
+    def write(self, vals):
+        """Rename or hide changed variants on the kitchen screens"""
+        if KITCHEN_VARIANT_FIELDS.intersection(vals):
+            self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return super().write(vals)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from odoo import models
+
+
+# Fields the kitchen station routing and product dictionary depend on
+KITCHEN_PRODUCT_FIELDS = {'pos_categ_ids', 'available_in_pos', 'name',
+                          'default_code', 'active'}
+
+
+class ProductTemplate(models.Model):
+    """Reset the kitchen station routing and product dictionary when the
+    products sold in POS change"""
+    _inherit = 'product.template'
+
+    def write(self, vals):
+        """Route moved products to their new stations"""
+        if KITCHEN_PRODUCT_FIELDS.intersection(vals):
+            self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return super().write(vals)
+
+    def _update_field_translations(self, field_name, translations, *args,
+                                   **kwargs):
+        """Rename translated products in the product dictionary"""
+        if field_name == 'name':
+            self.env['kitchen.screen']._invalidate_kitchen_catalog()
+        return super()._update_field_translations(field_name, translations,
+                                                  *args, **kwargs)
@@ -1,8 +1,11 @@
 /** @odoo-module */
 import { registry } from "@web/core/registry";
-const { Component, onMounted, onWillUnmount, useState } = owl;
+const { Component, onMounted, onWillStart, onWillUnmount, useState } = owl;
 import { useService } from "@web/core/utils/hooks";
 
+// localStorage key of the product names used to expand compact tickets
+const PRODUCT_DICTIONARY_KEY = "pos_kitchen_product_dictionary";
+
 class KitchenScreenDashboard extends Component {
   setup() {
     super.setup();
@@ -15,7 +18,13 @@ class KitchenScreenDashboard extends Component {
 
     // Derived values
     this.currentShopId = this.getCurrentShopId();
-    this.channel = `waiter-${this.currentShopId}`;
+    this.currentScreenId = this.getCurrentScreenId();
+    // Tickets nobody else shows come on the pos channel, the lines of this
+    // kitchen station on its own channel
+    this.channels = [`waiter-${this.currentShopId}`];
+    if (this.currentScreenId) {
+      this.channels.push(`kitchen-station-${this.currentScreenId}`);
+    }
 
     // component state (kept minimal)
     this.state = useState({
@@ -32,12 +41,30 @@ class KitchenScreenDashboard extends Component {
     console.log(this.currentShopId, this.state);
 
     this._onNotification = this._onNotification.bind(this);
+    this.productNames = {};
+
+    onWillStart(async () => {
+      await this.loadProductDictionary();
+      // Reload the persisted diff tickets of this kitchen
+      const tickets = await this.orm.call("kitchen.ticket", "get_tickets", [
+        this.currentShopId,
+        this.currentScreenId,
+      ]);
+      // the dictionary was just loaded, lines it misses carry their name
+      this.state.orders = tickets.map((ticket) => this.expandTicket(ticket));
+      this.state.draft_count = tickets.filter((t) => t.state === "draft").length;
+      this.state.ready_count = tickets.filter(
+        (t) => t.state === "completed"
+      ).length;
+    });
 
     onMounted(() => {
       // subscribe to bus
       try {
         if (this.busService) {
-          this.busService.addChannel(this.channel);
+          this.channels.forEach((channel) =>
+            this.busService.addChannel(channel)
+          );
           this.busService.subscribe(`notification`, this._onNotification);
           console.log("subscribed", this.state.shop_id);
         }
@@ -52,7 +79,9 @@ class KitchenScreenDashboard extends Component {
       try {
         if (this.busService) {
           this.busService.unsubscribe("notification", this._onNotification);
-          this.busService.deleteChannel(this.channel);
+          this.channels.forEach((channel) =>
+            this.busService.deleteChannel(channel)
+          );
         }
       } catch (err) {
         // eslint-disable-next-line no-console
@@ -83,6 +112,83 @@ class KitchenScreenDashboard extends Component {
     return parseInt(session_shop_id, 10) || 0;
   }
 
+  getCurrentScreenId() {
+    let session_screen_id;
+    if (this.props.action?.context?.default_screen_id) {
+      sessionStorage.setItem(
+        "screen_id",
+        this.props.action.context.default_screen_id
+      );
+      session_screen_id = this.props.action.context.default_screen_id;
+    } else {
+      session_screen_id = sessionStorage.getItem("screen_id");
+    }
+    return parseInt(session_screen_id, 10) || false;
+  }
+
+  /**
+   * Loads the product names tickets refer to by id, reusing the copy kept
+   * in localStorage when the server reports the same version.
+   */
+  async loadProductDictionary() {
+    let cached = null;
+    try {
+      cached = JSON.parse(localStorage.getItem(PRODUCT_DICTIONARY_KEY));
+    } catch {
+      cached = null;
+    }
+    const result = await this.orm.call(
+      "kitchen.ticket",
+      "get_product_dictionary",
+      [cached?.version || false]
+    );
+    if (result.not_modified) {
+      this.productNames = cached.products;
+      return;
+    }
+    this.productNames = result.products;
+    try {
+      localStorage.setItem(PRODUCT_DICTIONARY_KEY, JSON.stringify(result));
+    } catch (err) {
+      console.warn("Failed to cache the product dictionary", err);
+    }
+  }
+
+  /**
+   * Reloads the product dictionary, once for the whole batch, when lines
+   * of `tickets` refer to products it does not know without a name.
+   */
+  async ensureProductNames(tickets) {
+    const unknown = tickets.some((ticket) =>
+      ticket.lines.some(
+        ([productId, , , name]) => !name && !(productId in this.productNames)
+      )
+    );
+    if (unknown) {
+      await this.loadProductDictionary();
+    }
+  }
+
+  /**
+   * Turns the compact [product_id, qty, cancelled, name] lines of a ticket
+   * into the lines the template displays. The name is only sent for the
+   * products missing from the dictionary.
+   */
+  expandTicket(ticket) {
+    return {
+      ...ticket,
+      lines: ticket.lines.map(([productId, qty, cancelled, productName]) => {
+        const name =
+          this.productNames[productId] || productName || `#${productId}`;
+        return {
+          product_id: productId,
+          product_name: cancelled ? `CANCELLED: ${name}` : name,
+          qty,
+        };
+      }),
+    };
+  }
+
   async completeOrder(kitchen_order_id) {
     // Find index of the order
     const idx = this.state.orders.findIndex(
@@ -101,6 +207,9 @@ class KitchenScreenDashboard extends Component {
       this.state.orders[idx].state = "completed";
       this.state.ready_count = this.state.ready_count + 1;
       this.state.draft_count = this.state.draft_count - 1;
+      await this.orm.call("kitchen.ticket", "complete_ticket", [
+        kitchen_order_id,
+      ]);
       const status = await this.orm.call(
         "pos.order",
         "broadcast_order_update",
@@ -146,183 +255,28 @@ class KitchenScreenDashboard extends Component {
   }
 
   /**
-   * Processes an incoming order message, calculates the difference (diff) from the
-   * most recent version of the same order, and appends a new order containing
-   * only the diff lines to the state.
-   * @param {IncomingMessage} message - The incoming order data from the notification.
+   * Appends an incoming kitchen ticket to the state. Tickets are diffed
+   * against the previous ones of the same order on the server, so they
+   * only contain the added and CANCELLED lines.
+   * @param {Object} message - The ticket payload from the notification.
    */
-  add_order(message) {
-    function _normalizePosRef(ref) {
-      if (ref === null || ref === undefined) return "";
-      const s = String(ref).trim();
-      // Remove a single leading "Order" (any case), with optional whitespace following it.
-      return s.replace(/^\s*Order\s*/i, "").trim();
-    }
-
+  async add_order(message) {
     try {
       if (!message || typeof message !== "object") {
         console.warn("add_order: invalid message", message);
         return;
       }
-      const { config_id, pos_reference } = message;
+      await this.ensureProductNames([message]);
+      const ticket = this.expandTicket(message);
+      const orders = Array.isArray(this.state.orders) ? this.state.orders : [];
       if (
-        config_id === undefined ||
-        pos_reference === undefined ||
-        pos_reference === null
+        orders.some(
+          (order) => order.kitchen_order_id === ticket.kitchen_order_id
+        )
       ) {
-        console.warn(
-          "add_order: message missing config_id or pos_reference",
-          message
-        );
         return;
       }
-
-      const normalizedIncomingRef = _normalizePosRef(pos_reference);
-
-      // Helper: sanitize product name by removing any leading CANCELLED: prefixes (case-insensitive)
-      const stripCancelledPrefixes = (name = "") => {
-        if (name === null || name === undefined) return "";
-        return String(name)
-          .replace(/^(?:\s*CANCELLED:\s*)+/i, "")
-          .trim();
-      };
-
-      const orders = Array.isArray(this.state.orders) ? this.state.orders : [];
-
-      // Aggregate previous quantities across all stored orders whose pos_reference matches normalizedIncomingRef
-      const prevMap = new Map(); // product_id -> { qty: number, lastSanitizedName: string, lastRawName: string }
-
-      for (const existingOrder of orders) {
-        if (!existingOrder) continue;
-        const existingRefNorm = _normalizePosRef(existingOrder.pos_reference);
-        if (existingRefNorm !== normalizedIncomingRef) continue;
-        const lines = Array.isArray(existingOrder.lines)
-          ? existingOrder.lines
-          : [];
-        for (const line of lines) {
-          const pid = line && (line.product_id ?? line.productId);
-          if (pid === undefined || pid === null) continue;
-          const rawName = (line.product_name ?? "") + "";
-          const sanitized = stripCancelledPrefixes(rawName);
-          const isCancelled = /^\s*CANCELLED:\s*/i.test(rawName);
-          const qty = Number(line.qty);
-          const numericQty = Number.isFinite(qty) ? qty : 0;
-
-          const prevEntry = prevMap.get(pid) || {
-            qty: 0,
-            lastSanitizedName: "",
-            lastRawName: "",
-          };
-          prevEntry.qty += isCancelled ? -numericQty : numericQty;
-          prevEntry.lastSanitizedName =
-            sanitized || prevEntry.lastSanitizedName;
-          prevEntry.lastRawName = rawName || prevEntry.lastRawName;
-          prevMap.set(pid, prevEntry);
-        }
-      }
-
-      // Aggregate incoming message lines by product_id (new quantities)
-      const newMap = new Map(); // product_id -> { qty: number, lastRawName: string }
-      const incomingLines = Array.isArray(message.lines) ? message.lines : [];
-      for (const line of incomingLines) {
-        const pid = line && (line.product_id ?? line.productId);
-        if (pid === undefined || pid === null) continue;
-        const rawName = (line.product_name ?? "") + "";
-        const qty = Number(line.qty);
-        const numericQty = Number.isFinite(qty) ? qty : 0;
-
-        const entry = newMap.get(pid) || { qty: 0, lastRawName: "" };
-        entry.qty += numericQty;
-        entry.lastRawName = rawName || entry.lastRawName;
-        newMap.set(pid, entry);
-      }
-
-      // Union of product ids
-      const allProductIds = new Set([...prevMap.keys(), ...newMap.keys()]);
-      const diffLines = [];
-
-      for (const pid of allProductIds) {
-        const prevEntry = prevMap.get(pid) || {
-          qty: 0,
-          lastSanitizedName: "",
-          lastRawName: "",
-        };
-        const newEntry = newMap.get(pid) || { qty: 0, lastRawName: "" };
-
-        const prevQty = Number.isFinite(Number(prevEntry.qty))
-          ? Number(prevEntry.qty)
-          : 0;
-        const newQty = Number.isFinite(Number(newEntry.qty))
-          ? Number(newEntry.qty)
-          : 0;
-
-        if (newQty === prevQty) continue;
-
-        if (newQty > prevQty) {
-          const addedQty = newQty - prevQty;
-          const name =
-            (newEntry.lastRawName && String(newEntry.lastRawName).trim()) ||
-            prevEntry.lastSanitizedName ||
-            "";
-          diffLines.push({
-            product_id: pid,
-            product_name: name,
-            qty: addedQty,
-          });
-        } else {
-          const cancelQty = prevQty - newQty;
-          const baseNameRaw =
-            (newEntry.lastRawName && String(newEntry.lastRawName).trim()) ||
-            prevEntry.lastRawName ||
-            prevEntry.lastSanitizedName ||
-            "";
-          const sanitizedBase = stripCancelledPrefixes(baseNameRaw);
-          const cancelledName = sanitizedBase
-            ? `CANCELLED: ${sanitizedBase}`
-            : "CANCELLED:";
-          diffLines.push({
-            product_id: pid,
-            product_name: cancelledName,
-            qty: cancelQty,
-          });
-        }
-      }
-
-      if (diffLines.length === 0) return;
-
-      // Merge to ensure single line per product_id
-      const merged = new Map();
-      for (const l of diffLines) {
-        const pid = l.product_id;
-        const qty = Number(l.qty);
-        const numericQty = Number.isFinite(qty) ? qty : 0;
-        const name = l.product_name ?? "";
-        const existing = merged.get(pid);
-        if (!existing)
-          merged.set(pid, {
-            product_id: pid,
-            product_name: name,
-            qty: numericQty,
-          });
-        else existing.qty += numericQty;
-      }
-
-      const finalLines = Array.from(merged.values());
-
-      const newOrder = {
-        config_id: message.config_id,
-        pos_reference: message.pos_reference, // keep original form as provided
-        date_order: message.date_order,
-        from: message.from,
-        state: message.state,
-        floor: message.floor,
-        table: message.table,
-        lines: finalLines,
-        kitchen_order_id:
-          (Array.isArray(this.state.orders) ? this.state.orders.length : 0) + 1,
-      };
-
-      this.state.orders = [...orders, newOrder];
+      this.state.orders = [...orders, ticket];
       this.state.draft_count =
         (Number.isFinite(Number(this.state.draft_count))
           ? Number(this.state.draft_count)
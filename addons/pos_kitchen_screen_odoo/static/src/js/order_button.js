@@ -2,6 +2,9 @@
 import { PosStore } from "@point_of_sale/app/store/pos_store";
 import { patch } from "@web/core/utils/patch";
 
+// Window during which kitchen pushes are batched into a single RPC
+const KITCHEN_PUSH_WINDOW_MS = 300;
+
 patch(PosStore.prototype, {
   async setup(env, options) {
     await super.setup(env, options);
@@ -50,22 +53,16 @@ patch(PosStore.prototype, {
       table: order.table_id.table_number || "",
       floor: order.table_id.floor_id.name || "",
       state: order.state,
+      // Product ids and quantities only: the server resolves the names
       lines: order.lines.map((line) => ({
         product_id: line.product_id.id,
-        product_name: line.product_id.name,
         qty: line.qty,
-        price_unit: line.price_unit,
-        price_subtotal: line.price_subtotal,
-        price_subtotal_incl: line.price_subtotal_incl,
-        discount: line.discount,
-        note: line.note || "",
       })),
     };
     console.log(this.config.id);
-    const status = await this.orm.call("pos.order", "broadcast_order_update", [
-      `waiter-${this.config.id}`,
-      orderData,
-    ]);
+    // The server diffs the order against what the kitchen already has and
+    // broadcasts the resulting ticket on `waiter-${this.config.id}`
+    const status = await this._queueKitchenPush(orderData);
     console.log(status);
     return;
     // Try to persist a status update (safe non-blocking)
@@ -85,6 +82,35 @@ patch(PosStore.prototype, {
     }
   },
 
+  _queueKitchenPush(orderData) {
+    // Collect the pushes of a short window and send them in one RPC; the
+    // server collapses several states of the same order to the latest one.
+    this._kitchenQueue = this._kitchenQueue || [];
+    return new Promise((resolve, reject) => {
+      this._kitchenQueue.push({ orderData, resolve, reject });
+      if (!this._kitchenFlushTimer) {
+        this._kitchenFlushTimer = setTimeout(
+          () => this._flushKitchenQueue(),
+          KITCHEN_PUSH_WINDOW_MS
+        );
+      }
+    });
+  },
+
+  async _flushKitchenQueue() {
+    const queue = this._kitchenQueue || [];
+    this._kitchenQueue = [];
+    this._kitchenFlushTimer = null;
+    try {
+      const status = await this.orm.call("kitchen.ticket", "push_orders", [
+        queue.map((item) => item.orderData),
+      ]);
+      queue.forEach((item) => item.resolve(status));
+    } catch (err) {
+      queue.forEach((item) => item.reject(err));
+    }
+  },
+
   _showNotification(message, options = {}) {
     // Safe, minimal notification helper
     try {
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+import itertools
+import random
+import unittest
+from datetime import timedelta
+
+from odoo import Command, fields
+from odoo.tests import tagged
+
+from odoo.addons.point_of_sale.tests.common import TestPointOfSaleCommon
+
+try:
+    from odoo.addons.pos_restaurant_api.tests.common import BENCH_TAG, BenchmarkMixin
+except ImportError:
+    BENCH_TAG = 'pos_bench'
+
+    class BenchmarkMixin:
+        """The benchmark helpers come with pos_restaurant_api"""
+
+        @classmethod
+        def setUpClass(cls):
+            raise unittest.SkipTest("pos_restaurant_api is not available")
+
+CREATE_BATCH_SIZE = 1000
+LINES_PER_ORDER = 4
+# Orders are spread over this period, the most recent ones being active
+HISTORY_DAYS = 30
+
+
+@tagged(BENCH_TAG, '-standard', '-at_install', 'post_install')
+class TestKitchenBenchmark(BenchmarkMixin, TestPointOfSaleCommon):
+    """Cost of the kitchen screen RPCs on synthetic order histories, run
+    with ``--test-tags pos_bench``."""
+    # orders in the history
+    bench_scales = {
+        'small': 1000,
+        'medium': 10000,
+        'large': 50000,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pos_config.open_ui()
+        cls.session = cls.pos_config.current_session_id
+        categories = cls.env['pos.category'].create([
+            {'name': 'Bench kitchen'}, {'name': 'Bench bar'},
+        ])
+        cls.dishes = cls.env['product.product'].create([{
+            'name': f'Bench dish {i}',
+            'list_price': 10.0,
+            'available_in_pos': True,
+            'pos_categ_ids': [Command.set(categories[i % 2].ids)],
+        } for i in range(50)])
+        cls.screen = cls.env['kitchen.screen'].create({
+            'pos_config_id': cls.pos_config.id,
+            'pos_categ_ids': [Command.set(categories[0].ids)],
+        })
+
+    def _generate_orders(self, order_count):
+        """Create orders of a few lines, taken over `HISTORY_DAYS`."""
+        rng = random.Random(order_count)
+        now = fields.Datetime.now()
+        orders = self.env['pos.order']
+        for start in range(0, order_count, CREATE_BATCH_SIZE):
+            vals_list = []
+            for _i in range(start, min(start + CREATE_BATCH_SIZE, order_count)):
+                dishes = rng.sample(self.dishes.ids, LINES_PER_ORDER)
+                vals_list.append({
+                    'session_id': self.session.id,
+                    'date_order': now - timedelta(minutes=rng.randint(0, HISTORY_DAYS * 24 * 60)),
+                    'order_status': rng.choice(['draft', 'waiting']),
+                    'amount_tax': 0.0,
+                    'amount_total': 10.0 * LINES_PER_ORDER,
+                    'amount_paid': 0.0,
+                    'amount_return': 0.0,
+                    'lines': [Command.create({
+                        'product_id': product_id,
+                        'qty': 1,
+                        'price_unit': 10.0,
+                        'price_subtotal': 10.0,
+                        'price_subtotal_incl': 10.0,
+                    }) for product_id in dishes],
+                })
+            orders |= self.env['pos.order'].create(vals_list)
+            self.env.flush_all()
+        return orders
+
+    def _bench_kitchen(self, scale):
+        orders = self._generate_orders(self.bench_scale(scale))
+        PosOrder = self.env['pos.order']
+        shop_id = self.pos_config.id
+
+        self.measure('get_details', lambda: PosOrder.get_details(shop_id), scale)
+        self.measure('get_details.station', lambda: PosOrder.get_details(
+            shop_id, screen_id=self.screen.id), scale)
+        self.measure('get_history', lambda: PosOrder.get_history(shop_id), scale)
+
+        order = orders.sorted('date_order')[-1]
+        statuses = itertools.cycle(['waiting', 'draft'])
+        self.measure('update_order_status', lambda: PosOrder.update_order_status(
+            order.id, next(statuses)), scale)
+        self.measure('broadcast_order_update', lambda: PosOrder.broadcast_order_update(
+            f'waiter-{shop_id}', {'pos_reference': order.pos_reference, 'order_status': 'waiting'}), scale)
+
+    def test_kitchen_small(self):
+        self._bench_kitchen('small')
+
+    def test_kitchen_medium(self):
+        self._bench_kitchen('medium')
+
+    def test_kitchen_large(self):
+        self._bench_kitchen('large')
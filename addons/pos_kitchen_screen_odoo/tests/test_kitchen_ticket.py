@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2025-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+from odoo import Command
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestKitchenTicket(TransactionCase):
+    """Diffing of the order messages against the running totals"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pos_config = cls.env['pos.config'].create({'name': 'Kitchen'})
+        food, drinks = cls.env['pos.category'].create([
+            {'name': 'Food'}, {'name': 'Drinks'},
+        ])
+        cls.burger, cls.soda, cls.cake = cls.env['product.product'].create([{
+            'name': name,
+            'available_in_pos': True,
+            'pos_categ_ids': [Command.set(categories.ids)],
+        } for name, categories in [('Burger', food), ('Soda', drinks),
+                                   ('Cake', cls.env['pos.category'])]])
+        cls.kitchen, cls.bar = cls.env['kitchen.screen'].create([{
+            'pos_config_id': cls.pos_config.id,
+            'pos_categ_ids': [Command.set(categories.ids)],
+        } for categories in (food, drinks)])
+        cls.Ticket = cls.env['kitchen.ticket']
+
+    def _message(self, *lines, reference='Order 00001-001-0001'):
+        return {
+            'config_id': self.pos_config.id,
+            'pos_reference': reference,
+            'lines': [{'product_id': product.id, 'qty': qty}
+                      for product, qty in lines],
+        }
+
+    def _lines(self, tickets):
+        return sorted((
+            (line.product_id, line.qty, line.is_cancelled)
+            for line in tickets.line_ids
+        ), key=lambda line: line[0].id)
+
+    def _totals(self, reference='00001-001-0001'):
+        total = self.env['kitchen.ticket.total'].search([
+            ('config_id', '=', self.pos_config.id),
+            ('pos_reference', '=', reference),
+        ])
+        return {int(pid): vals['qty'] for pid, vals in total.totals.items()}
+
+    def test_add(self):
+        tickets = self.Ticket._process_order_message(
+            self._message((self.burger, 2)))
+        self.assertEqual(self._lines(tickets), [(self.burger, 2, False)])
+        self.assertEqual(tickets.line_ids.product_name, 'Burger')
+        self.assertEqual(self._totals(), {self.burger.id: 2})
+
+        tickets = self.Ticket._process_order_message(
+            self._message((self.burger, 3)))
+        self.assertEqual(self._lines(tickets), [(self.burger, 1, False)])
+        self.assertFalse(self.Ticket._process_order_message(
+            self._message((self.burger, 3))), "Nothing changed")
+
+    def test_partial_cancel(self):
+        self.Ticket._process_order_message(self._message((self.burger, 3)))
+        tickets = self.Ticket._process_order_message(
+            self._message((self.burger, 1)))
+        self.assertEqual(self._lines(tickets), [(self.burger, 2, True)])
+        self.assertEqual(self._totals(), {self.burger.id: 1})
+
+    def test_full_removal(self):
+        self.Ticket._process_order_message(
+            self._message((self.burger, 2), (self.soda, 1)))
+        tickets = self.Ticket._process_order_message(
+            self._message((self.soda, 1)))
+        self.assertEqual(self._lines(tickets), [(self.burger, 2, True)])
+        self.assertEqual(self._totals(), {self.soda.id: 1})
+
+    def test_coalesced_batch(self):
+        result = self.Ticket.push_orders([
+            self._message((self.burger, 1)),
+            self._message((self.burger, 3), reference='00001-001-0001'),
+        ])
+        tickets = self.Ticket.browse(result['ticket_ids'])
+        self.assertEqual(self._lines(tickets), [(self.burger, 3, False)],
+                         "Only the latest message of an order is diffed")
+        self.assertEqual(self._totals(), {self.burger.id: 3})
+
+    def test_station_split(self):
+        tickets = self.Ticket._process_order_message(self._message(
+            (self.burger, 1), (self.soda, 2), (self.cake, 1)))
+        self.assertEqual(
+            {ticket.screen_id: self._lines(ticket) for ticket in tickets},
+            {
+                self.kitchen: [(self.burger, 1, False)],
+                self.bar: [(self.soda, 2, False)],
+                # no station shows it, every screen of the pos does
+                self.env['kitchen.screen']: [(self.cake, 1, False)],
+            })
@@ -1,6 +1,6 @@
 {
     'name': 'Restaurant POS API Integration',
-    'version': '18.0',
+    'version': '18.0.18.1',
     'category': 'Point of Sale',
     'summary': 'Send POS orders to external API',
     'description': """
@@ -1,45 +1,95 @@
 import json
+from collections import defaultdict
+
+from werkzeug.exceptions import Forbidden
+
 from odoo import http
+from odoo.exceptions import UserError
 from odoo.http import request
+from odoo.tools import consteq
+
+from odoo.addons.pos_restaurant_api.metrics import METRICS_TOKEN_PARAM, export_prometheus, instrument, stage
+from odoo.addons.pos_restaurant_api.models.pos_menu_snapshot import image_unique, image_url
+
+
+# Seconds clients and proxies may reuse a GET menu before revalidating it
+MENU_HTTP_MAX_AGE = 60
 
 
 class PosMenuAPI(http.Controller):
 
-    def _get_product_data(self, product, pricelist):
-        """Helper to format product data and get the correct price."""
+    def _get_product_data(self, product, price):
+        """Helper to format product data with its precomputed price."""
         return {
             'id': product.id,
             'name': product.display_name,  # This will be translated
             'description': product.description_sale,  # This will be translated
-            'price': pricelist._get_product_price(product, 1.0, False),
-            'image_url': f'/web/image/product.template/{product.id}/image_1920',
+            'price': price,
+            'image_url': image_url('product.template', product.id, image_unique(product.write_date), 1920),
         }
 
-    def _build_category_tree(self, category, pricelist):
-        """Recursively builds the category tree with products."""
-        # Find active products available in POS for this category
-        products = request.env['product.template'].search([
-            ('active', '=', True),
-            ('available_in_pos', '=', True),
-            ('pos_categ_id', '=', category.id)
-        ])
-
-        product_list = [self._get_product_data(p, pricelist) for p in products]
-
-        # Find child categories
-        child_categories = request.env['pos.category'].search([
-            ('parent_id', '=', category.id)
-        ])
-
-        # Recursively build the tree for children
-        child_list = [self._build_category_tree(child, pricelist) for child in child_categories]
-
-        return {
-            'id': category.id,
-            'name': category.name,  # This will be translated
-            'products': product_list,
-            'children': child_list,
-        }
+    def _build_category_tree(self, pricelist, category=None):
+        """Builds the category tree with products in a fixed number of queries.
+
+        All POS categories and available templates are fetched at once, the
+        tree is assembled in memory and every price comes from a single
+        pricelist call. Returns the nodes under `category`, or the whole
+        tree when no category is given.
+        """
+        env = request.env(su=True)
+        with stage('load'):
+            categories = env['pos.category'].search_read([], ['name', 'parent_id'])
+            templates = env['product.template'].search([
+                ('active', '=', True),
+                ('available_in_pos', '=', True),
+            ])
+        with stage('pricing'):
+            prices = pricelist._get_products_price(templates, 1.0) if templates else {}
+
+        child_categories = defaultdict(list)
+        for c in categories:
+            child_categories[c['parent_id'][0] if c['parent_id'] else None].append(c)
+
+        category_products = defaultdict(list)
+        with stage('products'):
+            for product in templates:
+                data = self._get_product_data(product, prices.get(product.id, product.list_price))
+                for categ_id in product.pos_categ_ids.ids:
+                    category_products[categ_id].append(data)
+
+        def build(c):
+            return {
+                'id': c['id'],
+                'name': c['name'],  # This will be translated
+                'products': category_products[c['id']],
+                'children': [build(child) for child in child_categories[c['id']]],
+            }
+
+        with stage('tree'):
+            return [build(c) for c in child_categories[category.id if category else None]]
+
+    @http.route('/api/v1/pos-menu-tree', type='json', auth='public', cors='*')
+    @instrument('get_pos_menu_tree')
+    def get_pos_menu_tree(self, pos_config_id=None, lang='en_US'):
+        """
+        Returns the whole category tree of a POS configuration, with the
+        products of every category priced with the configuration pricelist.
+        """
+        if not pos_config_id:
+            return {'error': 'pos_config_id is required.'}
+
+        try:
+            request.update_context(lang=lang)
+            pos_config = request.env['pos.config'].sudo().browse(int(pos_config_id))
+            if not pos_config.exists():
+                return {'error': 'POS configuration not found.'}
+
+            return {
+                'language': lang,
+                'categories': self._build_category_tree(pos_config.pricelist_id),
+            }
+        except Exception as e:
+            return {'error': str(e)}
 
     # -*- coding: utf-8 -*-
     from odoo import http
@@ -47,86 +97,126 @@ class PosMenuAPI(http.Controller):
 
     class MenuTreeController(http.Controller):
 
+        def _not_modified(self, version, known_version=None):
+            """
+            Sets the ETag of the response and tells whether the client already
+            has this version, from `known_version` or the If-None-Match header.
+            """
+            request.future_response.headers['ETag'] = f'"{version}"'
+            if known_version:
+                return known_version == version
+            return request.httprequest.if_none_match.contains_weak(version)
+
         @http.route('/api/v1/pos-menu', type='json', auth='public', cors='*')
-        def get_pos_menu(self, pos_config_id=None, lang='en_US', category_id=None):
+        @instrument('get_pos_menu')
+        def get_pos_menu(self, pos_config_id=None, lang='en_US', category_id=None, known_version=None, langs=None):
             """
             Returns *only* the immediate children categories and products
             under `category_id`. If category_id is None, returns only root
             categories (parent_id = False) and no products.
+
+            With a list of `langs`, returns `{'menus': {lang: level}}` with
+            the level in every language, built together in a single pass.
+
+            The menu `version` is also sent as ETag. When the client already
+            has it (`known_version` or If-None-Match), only the version is
+            returned with `not_modified` set.
             """
             if not pos_config_id:
                 return {'error': 'pos_config_id is required.'}
 
             try:
-                # Prepare translation context
-                env = request.env(context=dict(request.env.context, lang=lang))
-                pos_config = env['pos.config'].sudo().browse(int(pos_config_id))
-                if not pos_config.exists():
-                    return {'error': 'POS configuration not found.'}
-
-                # Fetch flat data
-                raw = pos_config.load_self_data()
-                cats = raw['pos.category']['data']
-                prods = raw['product.product']['data']
-
-                # Determine which level to return
+                if langs:
+                    parent_key = None if category_id is None else int(category_id)
+                    menus = request.env['pos.menu.snapshot'].sudo()._get_menu_levels(int(pos_config_id), langs, parent_key)
+                    if menus is None:
+                        return {'error': 'POS configuration not found.'}
+                    return {'menus': menus}
+
+                version = request.env['pos.menu.snapshot'].sudo()._get_menu_version(int(pos_config_id), lang)
+                if self._not_modified(version, known_version):
+                    return {'version': version, 'not_modified': True}
+
+                # Serve the level from the cached catalog snapshot
                 parent_key = None if category_id is None else int(category_id)
-
-                # 1) Filter subcategories at this level
-                level_cats = [c for c in cats if (c.get('parent_id') or None) == parent_key]
-
-                # 2) Serialize categories
-                level_cats = [c for c in cats if (c.get('parent_id') or None) == parent_key]
-                categories = []
-                for c in level_cats:
-                    # build the image URL only if has_image is True
-                    img_url = None
-                    if c.get('has_image'):
-                        img_url = f"/web/image/pos.category/{c['id']}/image_1024"
-
-                    categories.append({
-                        'id': c['id'],
-                        'name': c['name'],
-                        'has_more': any(ch['parent_id'] == c['id'] for ch in cats),
-                        'image_url': img_url,
-                        'parent_id': c['parent_id']
-                    })
-
-
-                # 3) If drilling into a real category, also fetch its products
-                products = []
-                if parent_key:
-                    for p in prods:
-                        if p.get('available_in_pos') and parent_key in (p.get('pos_categ_ids') or []):
-                            products.append({
-                                'id': p['id'],
-                                'name': p['display_name'],
-                                'price': p['lst_price'],
-                                'price_incl': p['list_price'],
-                                'description': p['public_description'],
-                                'image_url': f"/web/image/product.product/{p['id']}/image_1024",
-                            })
-                category_name = None
-                if parent_key is not None:
-                    category_name = next((c['name'] for c in cats if c['id'] == parent_key), None)
-
-                return {
-                    'language': lang,
-                    'category_id': parent_key,
-                    'category_name':category_name,
-                    'categories': categories,
-                    'products': products,
-                }
+                level = request.env['pos.menu.snapshot'].sudo()._get_menu_level(int(pos_config_id), lang, parent_key)
+                if level is None:
+                    return {'error': 'POS configuration not found.'}
+                return level
 
             except Exception as e:
                 return {'error': str(e)}
 
+        @http.route('/api/v1/pos-menu/<int:pos_config_id>', type='http', methods=['GET'], auth='public', cors='*', save_session=False)
+        @instrument('get_pos_menu_http')
+        def get_pos_menu_http(self, pos_config_id, lang='en_US', category_id=None):
+            """
+            Plain GET variant of `/api/v1/pos-menu`, cacheable by clients and
+            reverse proxies. The body is serialized and compressed once per
+            menu version, so a hot request only picks the stored bytes
+            matching Accept-Encoding. No session cookie is set, as shared
+            caches do not store responses setting cookies.
+            """
+            try:
+                parent_key = int(category_id) if category_id else None
+            except ValueError:
+                return request.make_json_response({'error': 'category_id must be an integer.'}, status=400)
+
+            Snapshot = request.env['pos.menu.snapshot'].sudo()
+            version = Snapshot._get_menu_version(pos_config_id, lang)
+            headers = [
+                ('ETag', f'"{version}"'),
+                ('Cache-Control', f'public, max-age={MENU_HTTP_MAX_AGE}'),
+                ('Vary', 'Accept-Encoding'),
+            ]
+            if request.httprequest.if_none_match.contains_weak(version):
+                return request.make_response(b'', headers=headers, status=304)
+
+            try:
+                encoded = Snapshot._get_encoded_menu_level(pos_config_id, lang, parent_key)
+            except UserError as e:
+                return request.make_json_response({'error': str(e)}, status=400)
+            if encoded is None:
+                return request.make_json_response({'error': 'POS configuration not found.'}, status=404)
+
+            encoding = request.httprequest.accept_encodings.best_match(
+                [e for e in ('br', 'gzip') if e in encoded], default='identity')
+            if encoding != 'identity':
+                headers.append(('Content-Encoding', encoding))
+            headers.append(('Content-Type', 'application/json; charset=utf-8'))
+            return request.make_response(encoded[encoding], headers=headers)
+
+        @http.route('/api/v1/pos-menu/<int:pos_config_id>/export', type='http', methods=['GET'], auth='public', cors='*', save_session=False)
+        @instrument('export_pos_menu')
+        def export_pos_menu(self, pos_config_id, lang='en_US'):
+            """
+            Streams the whole menu of a POS configuration as NDJSON: one
+            `menu` header line, then one line per category and per product,
+            so large catalogs start arriving immediately.
+            """
+            try:
+                lines = request.env['pos.menu.snapshot'].sudo()._iter_menu_export(pos_config_id, lang)
+            except UserError as e:
+                return request.make_json_response({'error': str(e)}, status=400)
+            if lines is None:
+                return request.make_json_response({'error': 'POS configuration not found.'}, status=404)
+            return request.make_response(lines, headers=[
+                ('Content-Type', 'application/x-ndjson; charset=utf-8'),
+                ('Cache-Control', f'public, max-age={MENU_HTTP_MAX_AGE}'),
+            ])
+
         @http.route('/api/v1/pos-menu-languages', type='json', auth='public', cors='*')
-        def get_pos_languages(self):
+        @instrument('get_pos_languages')
+        def get_pos_languages(self, known_version=None):
             """
             Returns all available languages with their codes, display names, and flag icons.
+            Supports the same `version` / `not_modified` exchange as the menu.
             """
             try:
+                version = request.env['pos.menu.snapshot'].sudo()._get_menu_version('languages')
+                if self._not_modified(version, known_version):
+                    return {'version': version, 'not_modified': True}
+
                 # Fetch all languages and include their flag icons
                 langs = request.env['res.lang'].sudo().search([])
                 data = []
@@ -136,6 +226,24 @@ class PosMenuAPI(http.Controller):
                         'name':         lang.display_name,
                         'flag_icon':    lang.flag_image_url,
                     })
-                return {'languages': data}
+                return {'version': version, 'languages': data}
             except Exception as e:
-                return {'error': str(e)}
\ No newline at end of file
+                return {'error': str(e)}
+
+        @http.route('/api/v1/pos-metrics', type='http', methods=['GET'], auth='public')
+        def get_pos_metrics(self):
+            """
+            Metrics of the instrumented endpoints recorded by this worker, in
+            the Prometheus text format. Reserved to system administrators, or
+            to scrapers sending the `pos_restaurant_api.metrics_token` system
+            parameter as Bearer token.
+            """
+            token = request.env['ir.config_parameter'].sudo().get_param(METRICS_TOKEN_PARAM)
+            authorization = request.httprequest.headers.get('Authorization', '')
+            if not (token and consteq(authorization, f'Bearer {token}')) \
+                    and not request.env.user.has_group('base.group_system'):
+                raise Forbidden()
+            return request.make_response(export_prometheus(), headers=[
+                ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+                ('Cache-Control', 'no-store'),
+            ])
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""In-process instrumentation of the menu and kitchen hot paths.
+
+Instrumented endpoints record the duration of their stages, their SQL query
+count, the size of their HTTP responses and their cache hits into fixed-size
+histograms kept by each worker, exposed in the Prometheus text format.
+Recording is off unless the ``pos_restaurant_api.metrics`` system parameter
+is set; a disabled call only costs the (ormcached) parameter lookup.
+"""
+import contextlib
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from odoo import models
+from odoo.http import request
+
+METRICS_PARAM = 'pos_restaurant_api.metrics'
+SERVER_TIMING_PARAM = 'pos_restaurant_api.server_timing'
+METRICS_TOKEN_PARAM = 'pos_restaurant_api.metrics_token'
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative histogram over fixed bucket bounds."""
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+# metric name -> (help, bounds, {labels: Histogram})
+_histograms = {
+    'pos_api_stage_seconds': ("Duration of the stages of the POS API endpoints", DURATION_BUCKETS, {}),
+    'pos_api_queries': ("SQL queries per POS API call", QUERY_BUCKETS, {}),
+    'pos_api_response_bytes': ("Size of the POS API responses", SIZE_BUCKETS, {}),
+}
+# (endpoint, cache, 'hit' or 'miss') -> count
+_cache_counts = defaultdict(int)
+
+
+def _observe(name, labels, value):
+    _help, bounds, series = _histograms[name]
+    with _lock:
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(bounds)
+        histogram.observe(value)
+
+
+def _query_count():
+    # maintained by the cursors for the requests of the http server
+    return getattr(threading.current_thread(), 'query_count', 0)
+
+
+class CallMetrics:
+    """Measures of one instrumented call, recorded when it ends."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.stages = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def record(self, duration, queries, size):
+        for name, stage_duration in self.stages + [('total', duration)]:
+            _observe('pos_api_stage_seconds', (self.endpoint, name), stage_duration)
+        _observe('pos_api_queries', (self.endpoint,), queries)
+        if size is not None:
+            _observe('pos_api_response_bytes', (self.endpoint,), size)
+
+    def server_timing(self, duration):
+        return ', '.join(
+            f'{name};dur={stage_duration * 1000:.1f}'
+            for name, stage_duration in self.stages + [('total', duration)]
+        )
+
+
+def stage(name):
+    """Context manager timing a stage of the current instrumented call,
+    doing nothing outside of one."""
+    current = getattr(_local, 'current', None)
+    if current is None:
+        return contextlib.nullcontext()
+    return current.stage(name)
+
+
+def record_cache(cache, hit):
+    """Count a hit or miss of `cache` for the current instrumented call."""
+    current = getattr(_local, 'current', None)
+    if current is not None:
+        with _lock:
+            _cache_counts[current.endpoint, cache, 'hit' if hit else 'miss'] += 1
+
+
+def _response_size(result):
+    """Size of an HTTP response body, None for the results serialized by
+    the JSON-RPC layer or streamed without a known length."""
+    length = getattr(result, 'calculate_content_length', None)
+    return length() if length else None
+
+
+def instrument(endpoint):
+    """Decorate a controller route or a model RPC to record its metrics
+    under `endpoint`. Calls nested in an instrumented call are recorded as
+    one of its stages."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if getattr(_local, 'current', None) is not None:
+                with stage(endpoint):
+                    return func(self, *args, **kwargs)
+            env = self.env if isinstance(self, models.BaseModel) else request and request.env
+            if env is None:
+                return func(self, *args, **kwargs)
+            get_param = env['ir.config_parameter'].sudo().get_param
+            if not get_param(METRICS_PARAM):
+                return func(self, *args, **kwargs)
+
+            current = _local.current = CallMetrics(endpoint)
+            queries = _query_count()
+            start = time.perf_counter()
+            try:
+                result = func(self, *args, **kwargs)
+            finally:
+                _local.current = None
+            duration = time.perf_counter() - start
+            current.record(duration, _query_count() - queries, _response_size(result))
+            if request and get_param(SERVER_TIMING_PARAM):
+                request.future_response.headers['Server-Timing'] = current.server_timing(duration)
+            return result
+        return wrapper
+    return decorator
+
+
+def _format_labels(names, values):
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+def export_prometheus():
+    """Render the metrics of this worker in the Prometheus text format."""
+    pid = os.getpid()
+    label_names = {
+        'pos_api_stage_seconds': ('endpoint', 'stage'),
+        'pos_api_queries': ('endpoint',),
+        'pos_api_response_bytes': ('endpoint',),
+    }
+    lines = []
+    with _lock:
+        for name, (help_text, bounds, series) in _histograms.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for labels, histogram in sorted(series.items()):
+                base = _format_labels(('pid',) + label_names[name], (pid,) + labels)
+                cumulative = 0
+                for bound, count in zip(bounds + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{base}}} {histogram.sum}')
+                lines.append(f'{name}_count{{{base}}} {cumulative}')
+
+        lines += ['# HELP pos_api_cache_total Cache lookups of the POS API',
+                  '# TYPE pos_api_cache_total counter']
+        for labels, count in sorted(_cache_counts.items()):
+            base = _format_labels(('pid', 'endpoint', 'cache', 'result'), (pid,) + labels)
+            lines.append(f'pos_api_cache_total{{{base}}} {count}')
+    return '\n'.join(lines) + '\n'
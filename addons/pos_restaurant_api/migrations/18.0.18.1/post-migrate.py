@@ -0,0 +1,11 @@
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    """Category image variants are now resized on demand from image_1920:
+    drop the attachments stored for them by previous versions."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['ir.attachment'].search([
+        ('res_model', '=', 'pos.category'),
+        ('res_field', 'in', ['image_1024', 'image_512', 'image_256', 'image_128']),
+    ]).unlink()
@@ -1,3 +1,10 @@
 
+from . import pos_menu_snapshot
 from . import pos_category
+from . import pos_config
+from . import product_pricelist
+from . import product_pricelist_item
+from . import product_product
+from . import product_template
+from . import res_lang
 
@@ -1,32 +1,132 @@
+import base64
+import threading
+from collections import OrderedDict
+
 from odoo import models, fields, api
+from odoo.tools import image_process
+
+# Budget of the resized images kept by each worker
+IMAGE_VARIANT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class ImageVariantCache:
+    """LRU of resized images bounded by their total size rather than their
+    count, as a 1024px variant weighs a hundred times a 128px one."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        value_size = len(value or b'')
+        if value_size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            self.size -= len(previous or b'')
+            self._data[key] = value
+            self.size += value_size
+            while self.size > self.max_bytes:
+                _key, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted or b'')
+
+
+# (master image checksum, size) -> resized image, shared by all categories
+_image_variants = ImageVariantCache(IMAGE_VARIANT_CACHE_BYTES)
+
 
 class PosCategory(models.Model):
-    _inherit = 'pos.category'
+    _name = 'pos.category'
+    _inherit = ['pos.category', 'pos.menu.invalidation.mixin']
+
+    _pos_menu_fields = {'name', 'parent_id', 'sequence', 'image_1920'}
 
     image_1920 = fields.Image(
         "Image (1920px)",
         max_width=1920, max_height=1920,
         help="Master high‑resolution image"
     )
+    # Variants are resized on demand from the master, nothing is stored
     image_1024 = fields.Image(
-        compute='_compute_images',
-        inverse='_inverse_image',
+        compute='_compute_image_1024',
+        inverse='_inverse_image_1024',
         max_width=1024, max_height=1024,
-        store=True
     )
-    image_512  = fields.Image(compute='_compute_images', inverse='_inverse_image', max_width=512,  max_height=512,  store=True)
-    image_256  = fields.Image(compute='_compute_images', inverse='_inverse_image', max_width=256,  max_height=256,  store=True)
-    image_128  = fields.Image(compute='_compute_images', inverse='_inverse_image', max_width=128,  max_height=128,  store=True)
+    image_512  = fields.Image(compute='_compute_image_512', inverse='_inverse_image_512', max_width=512,  max_height=512)
+    image_256  = fields.Image(compute='_compute_image_256', inverse='_inverse_image_256', max_width=256,  max_height=256)
+    image_128  = fields.Image(compute='_compute_image_128', inverse='_inverse_image_128', max_width=128,  max_height=128)
+
+    def _get_image_checksums(self):
+        """Checksum of the master image of each saved category that has one."""
+        ids = [rec.id for rec in self if rec.id]
+        if not ids:
+            return {}
+        attachments = self.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', ids),
+        ], ['res_id', 'checksum'])
+        return {a['res_id']: a['checksum'] for a in attachments}
+
+    def _compute_image_variant(self, field_name, size):
+        """Resize the master image, caching the result by content hash so
+        categories sharing an image share the resized copies."""
+        checksums = self._get_image_checksums()
+        for rec in self:
+            checksum = checksums.get(rec.id)
+            variant = _image_variants.get((checksum, size)) if checksum else None
+            if variant is None:
+                variant = rec.image_1920 and base64.b64encode(
+                    image_process(base64.b64decode(rec.image_1920), size=(size, size)))
+                if checksum:
+                    _image_variants[(checksum, size)] = variant
+            rec[field_name] = variant or False
+
+    @api.depends('image_1920')
+    def _compute_image_1024(self):
+        self._compute_image_variant('image_1024', 1024)
+
+    @api.depends('image_1920')
+    def _compute_image_512(self):
+        self._compute_image_variant('image_512', 512)
+
+    @api.depends('image_1920')
+    def _compute_image_256(self):
+        self._compute_image_variant('image_256', 256)
 
     @api.depends('image_1920')
-    def _compute_images(self):
+    def _compute_image_128(self):
+        self._compute_image_variant('image_128', 128)
+
+    @api.depends('image_1920')
+    def _compute_has_image(self):
+        # avoid resizing the image only to know whether there is one
+        checksums = self._get_image_checksums()
         for rec in self:
-            rec.image_1024 = rec.image_1920
-            rec.image_512  = rec.image_1920
-            rec.image_256  = rec.image_1920
-            rec.image_128  = rec.image_1920
+            rec.has_image = rec.id in checksums if rec.id else bool(rec.image_1920)
 
-    def _inverse_image(self):
+    def _inverse_image_variant(self, field_name):
         for rec in self:
             # whichever size was written, use it to overwrite the master
-            rec.image_1920 = rec.image_128 or rec.image_256 or rec.image_512 or rec.image_1024
+            rec.image_1920 = rec[field_name]
+
+    def _inverse_image_1024(self):
+        self._inverse_image_variant('image_1024')
+
+    def _inverse_image_512(self):
+        self._inverse_image_variant('image_512')
+
+    def _inverse_image_256(self):
+        self._inverse_image_variant('image_256')
+
+    def _inverse_image_128(self):
+        self._inverse_image_variant('image_128')
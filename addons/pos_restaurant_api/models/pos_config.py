@@ -0,0 +1,11 @@
+from odoo import models
+
+
+class PosConfig(models.Model):
+    _name = 'pos.config'
+    _inherit = ['pos.config', 'pos.menu.invalidation.mixin']
+
+    _pos_menu_fields = {
+        'active', 'pricelist_id', 'available_pricelist_ids', 'limit_categories',
+        'iface_available_categ_ids', 'iface_tax_included', 'company_id',
+    }
@@ -0,0 +1,590 @@
+import contextlib
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from collections import defaultdict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from odoo import _, api, models
+from odoo.exceptions import UserError
+from odoo.tools import config
+from odoo.tools.lru import LRU
+
+from odoo.addons.pos_restaurant_api.metrics import record_cache, stage
+
+_logger = logging.getLogger(__name__)
+
+# One row per transaction that changed the menu catalog: inserting locks no
+# row, and a transaction only sees the rows of the committed changes
+MENU_VERSION_TABLE = 'pos_menu_catalog_version'
+MENU_SNAPSHOT_CACHE_SIZE = 64
+ENCODED_MENU_CACHE_SIZE = 512
+
+IMAGE_SIZES = (128, 256, 512, 1024)
+
+# (dbname, pos_config_id, lang) -> (catalog version, snapshot)
+_menu_snapshots = LRU(MENU_SNAPSHOT_CACHE_SIZE)
+# (dbname, pos_config_id, lang, category_id, menu version) -> {encoding: bytes}
+_encoded_menus = LRU(ENCODED_MENU_CACHE_SIZE)
+
+
+def image_unique(write_date):
+    """Short version token derived from a write date, like website images."""
+    return hashlib.sha512(str(write_date).encode()).hexdigest()[:7]
+
+
+def image_url(model, record_id, unique, size=1024):
+    """Versioned image URL. `/web/image` serves URLs carrying a `unique`
+    token with a long-lived immutable Cache-Control."""
+    return f"/web/image/{model}/{record_id}/image_{size}?unique={unique}"
+
+
+def image_srcset(model, record_id, unique):
+    """`srcset` attribute listing every image size with its width."""
+    return ', '.join(
+        f"{image_url(model, record_id, unique, size)} {size}w" for size in IMAGE_SIZES
+    )
+
+
+def _shared_snapshot_path(dbname, pos_config_id, lang, version='*'):
+    """File of a snapshot in the store shared by the workers of this host."""
+    name = '-'.join(re.sub(r'[^\w@.]', '_', str(part)) for part in (pos_config_id, lang))
+    return os.path.join(config['data_dir'], 'pos_menu_snapshots', dbname, f'{name}-{version}.json')
+
+
+@contextlib.contextmanager
+def _shared_snapshot_lock(dbname, pos_config_id, version):
+    """Serialize the snapshot builds of a config version across processes,
+    so a catalog change is built by a single worker, for all languages,
+    while the others wait for its files."""
+    if fcntl is None:
+        yield
+        return
+    path = _shared_snapshot_path(dbname, pos_config_id, 'x', version)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f'{pos_config_id}-{version}.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PosMenuSnapshot(models.AbstractModel):
+    _name = 'pos.menu.snapshot'
+    _description = 'POS Menu Snapshot Cache'
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {MENU_VERSION_TABLE} (
+                id bigserial PRIMARY KEY,
+                create_date timestamp NOT NULL DEFAULT (now() at time zone 'UTC')
+            )
+        """)
+
+    @api.model
+    def _get_catalog_version(self):
+        """Token that changes whenever the menu catalog is modified.
+
+        The token hashes the ids of the version rows the transaction sees,
+        so a snapshot is cached under a version reflecting exactly the
+        committed changes it was built from, even when transactions commit
+        in another order than they inserted their row. A transaction with
+        uncommitted catalog changes gets a token of its own, so what it
+        builds is never served to the others.
+        """
+        pending = self.env.cr.precommit.data.get('pos_restaurant_api.menu_invalidated')
+        return pending or self._get_committed_catalog_version()
+
+    @api.model
+    def _get_committed_catalog_version(self):
+        self.env.cr.execute(f"""
+            SELECT md5(string_agg(id::text, ',' ORDER BY id)) FROM {MENU_VERSION_TABLE}
+        """)
+        return self.env.cr.fetchone()[0] or '0'
+
+    @api.model
+    def _get_menu_version(self, *key):
+        """Version of one menu, e.g. ``(pos_config_id, lang)``, derived from
+        the catalog version so it is known without building anything."""
+        token = '-'.join(map(str, (self._get_catalog_version(), *key)))
+        return hashlib.sha1(token.encode()).hexdigest()[:16]
+
+    @api.model
+    def _invalidate_snapshots(self):
+        """Add a catalog version when the transaction commits.
+
+        The row is inserted once, right before the commit, so no snapshot
+        of the transaction's own partial changes is cached under it, and a
+        transaction rolled back adds no version at all.
+        """
+        data = self.env.cr.precommit.data
+        if not data.get('pos_restaurant_api.menu_invalidated'):
+            self.env.cr.precommit.add(self._bump_catalog_version)
+        # a new token for every change, the transaction's own caches included
+        data['pos_restaurant_api.menu_invalidated'] = uuid.uuid4().hex
+
+    @api.model
+    def _bump_catalog_version(self):
+        self.env.cr.execute(f"INSERT INTO {MENU_VERSION_TABLE} DEFAULT VALUES")
+
+    @api.autovacuum
+    def _gc_catalog_versions(self):
+        """Drop the catalog versions older than a day but the last one.
+        Those were committed before any newer one was inserted, so the
+        remaining set of ids still differs from every earlier one."""
+        self.env.cr.execute(f"""
+            DELETE FROM {MENU_VERSION_TABLE}
+             WHERE create_date < (now() at time zone 'UTC') - interval '1 day'
+               AND id < (SELECT max(id) FROM {MENU_VERSION_TABLE})
+        """)
+
+    @api.model
+    def _get_snapshot(self, pos_config_id, lang):
+        """Return the menu snapshot of a POS config in the given language.
+
+        Snapshots are kept in a bounded LRU and rebuilt only when the catalog
+        version changed, so a cache hit does not touch the ORM. Returns None
+        when the POS config does not exist.
+        """
+        return self._get_snapshots(pos_config_id, [lang])[lang]
+
+    @api.model
+    def _get_snapshots(self, pos_config_id, langs):
+        """Return the menu snapshots of a POS config for several languages.
+
+        Snapshots are looked up in the worker LRU, then in the store shared
+        by the workers of the host. The missing ones are built together, with
+        the other installed languages that are not cached either, so warming
+        the cache after a catalog edit costs about one build.
+
+        Raises a UserError for languages that are not installed, before any
+        build, file or cache entry is made for them.
+        """
+        installed = {code for code, _name in self.env['res.lang'].get_installed()}
+        unknown = [lang for lang in langs if lang not in installed]
+        if unknown:
+            raise UserError(_("Language not installed: %s", ', '.join(map(str, unknown))))
+        version = self._get_catalog_version()
+        dbname = self.env.cr.dbname
+        snapshots = {}
+        missing = []
+        for lang in langs:
+            snapshot = self._lookup_snapshot((dbname, pos_config_id, lang), version)
+            record_cache('snapshot', snapshot is not None)
+            if snapshot is None:
+                missing.append(lang)
+            snapshots[lang] = snapshot
+        if not missing:
+            return snapshots
+
+        # Another worker may be building the same version: wait for it
+        with _shared_snapshot_lock(dbname, pos_config_id, version):
+            for lang in list(missing):
+                snapshots[lang] = self._lookup_snapshot((dbname, pos_config_id, lang), version)
+                if snapshots[lang] is not None:
+                    missing.remove(lang)
+            if not missing:
+                return snapshots
+
+            missing += [
+                code for code in sorted(installed)
+                if code not in langs
+                and not self._is_snapshot_available((dbname, pos_config_id, code), version)
+            ]
+            with stage('build'):
+                built = self._build_snapshots(pos_config_id, missing)
+            for lang, snapshot in built.items():
+                key = (dbname, pos_config_id, lang)
+                self._write_shared_snapshot(_shared_snapshot_path(*key, version), snapshot)
+                _menu_snapshots[key] = (version, snapshot)
+                if lang in snapshots:
+                    snapshots[lang] = snapshot
+            self._gc_shared_snapshots()
+        return snapshots
+
+    @api.model
+    def _lookup_snapshot(self, key, version):
+        """Return an already built snapshot from the worker LRU or the shared
+        store, or None."""
+        cached = _menu_snapshots.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        snapshot = self._read_shared_snapshot(_shared_snapshot_path(*key, version))
+        if snapshot is not None:
+            _menu_snapshots[key] = (version, snapshot)
+        return snapshot
+
+    @api.model
+    def _is_snapshot_available(self, key, version):
+        cached = _menu_snapshots.get(key)
+        return bool(cached and cached[0] == version) or os.path.exists(_shared_snapshot_path(*key, version))
+
+    @api.model
+    def _read_shared_snapshot(self, path):
+        """Load a snapshot from the shared store, or None if absent."""
+        try:
+            with open(path, 'rb') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            _logger.warning("Could not read menu snapshot %s", path, exc_info=True)
+            return None
+        # indexes are stored as pairs to keep their integer and None keys
+        return {name: dict(pairs) for name, pairs in data.items()}
+
+    @api.model
+    def _write_shared_snapshot(self, path, snapshot):
+        """Atomically publish a snapshot."""
+        directory = os.path.dirname(path)
+        data = {name: list(index.items()) for name, index in snapshot.items()}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as f:
+                json.dump(data, f, separators=(',', ':'), default=str)
+            os.replace(f.name, path)
+        except OSError:
+            _logger.warning("Could not write menu snapshot %s", path, exc_info=True)
+
+    @api.autovacuum
+    def _gc_shared_snapshots(self):
+        """Drop the snapshot and lock files of the database made for an
+        older catalog version, whatever their config and language, and
+        those of deleted configs."""
+        directory = os.path.dirname(_shared_snapshot_path(self.env.cr.dbname, 0, 'x'))
+        version = self._get_committed_catalog_version()
+        configs = self.env['pos.config'].sudo().with_context(active_test=False).search([])
+        config_ids = {str(config_id) for config_id in configs.ids}
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            if path.rsplit('-', 1)[1] != f'{version}.json':
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+        for path in glob.glob(os.path.join(directory, '*.lock')):
+            config_id, _sep, lock_version = os.path.basename(path).partition('-')
+            if config_id not in config_ids or lock_version != f'{version}.lock':
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    @api.model
+    def _get_menu_level(self, pos_config_id, lang, category_id=None):
+        """Return the categories and products directly under `category_id`
+        (root categories and no products when None), or None when the POS
+        config does not exist."""
+        snapshot = self._get_snapshot(pos_config_id, lang)
+        if snapshot is None:
+            return None
+        categories = snapshot['categories']
+        products_by_id = snapshot['products']
+
+        # 1) Subcategories at this level
+        level_cats = [categories[cid] for cid in snapshot['children'].get(category_id, ())]
+
+        # 2) If drilling into a real category, also return its products
+        products = []
+        if category_id:
+            products = [products_by_id[pid] for pid in snapshot['category_products'].get(category_id, ())]
+
+        category_name = None
+        if category_id is not None and category_id in categories:
+            category_name = categories[category_id]['name']
+
+        return {
+            'version': self._get_menu_version(pos_config_id, lang),
+            'language': lang,
+            'category_id': category_id,
+            'category_name': category_name,
+            'categories': level_cats,
+            'products': products,
+        }
+
+    @api.model
+    def _get_menu_levels(self, pos_config_id, langs, category_id=None):
+        """Return a menu level for each of `langs`, building the missing
+        languages in a single pass. Returns None when the POS config does not
+        exist."""
+        snapshots = self._get_snapshots(pos_config_id, langs)
+        if any(snapshot is None for snapshot in snapshots.values()):
+            return None
+        return {lang: self._get_menu_level(pos_config_id, lang, category_id) for lang in langs}
+
+    @api.model
+    def _iter_menu_export(self, pos_config_id, lang):
+        """Return a generator of NDJSON lines with the whole menu: a header
+        line, every category (parents before children) with its product
+        ids, then every product. Returns None if the POS config does not
+        exist.
+
+        The lines are produced lazily from the cached snapshot, which holds
+        no cursor, so the generator can run after the request transaction
+        ended and the full output is never materialized.
+        """
+        snapshot = self._get_snapshot(pos_config_id, lang)
+        if snapshot is None:
+            return None
+        header = {
+            'type': 'menu',
+            'version': self._get_menu_version(pos_config_id, lang),
+            'language': lang,
+            'pos_config_id': pos_config_id,
+        }
+
+        def dumps(record_type, values, **extra):
+            line = {'type': record_type, **values, **extra}
+            return json.dumps(line, separators=(',', ':'), default=str).encode() + b'\n'
+
+        def generate():
+            yield json.dumps(header, separators=(',', ':')).encode() + b'\n'
+            categories = snapshot['categories']
+            children = snapshot['children']
+            category_products = snapshot['category_products']
+            # roots, including categories whose parent is not in the menu
+            stack = [
+                cid for cid, c in reversed(categories.items())
+                if c['parent_id'] not in categories
+            ]
+            while stack:
+                category_id = stack.pop()
+                yield dumps('category', categories[category_id],
+                            product_ids=category_products.get(category_id, []))
+                stack.extend(reversed(children.get(category_id, ())))
+            for product in snapshot['products'].values():
+                yield dumps('product', product)
+
+        return generate()
+
+    @api.model
+    def _get_encoded_menu_level(self, pos_config_id, lang, category_id=None):
+        """Return a menu level serialized once per menu version, as a dict
+        mapping each available content encoding to the response body."""
+        version = self._get_menu_version(pos_config_id, lang)
+        key = (self.env.cr.dbname, pos_config_id, lang, category_id, version)
+        encoded = _encoded_menus.get(key)
+        record_cache('encoded_menu', encoded is not None)
+        if encoded is not None:
+            return encoded
+
+        level = self._get_menu_level(pos_config_id, lang, category_id)
+        if level is None:
+            return None
+        with stage('encode'):
+            body = json.dumps(level, separators=(',', ':'), default=str).encode()
+            encoded = {'identity': body, 'gzip': gzip.compress(body)}
+            if brotli is not None:
+                encoded['br'] = brotli.compress(body)
+        _encoded_menus[key] = encoded
+        return encoded
+
+    @api.model
+    def _build_snapshots(self, pos_config_id, langs):
+        """Build the snapshots of several languages in a single pass.
+
+        The catalog structure (ids, parents, prices, availability) is loaded
+        once with `load_self_data()` in the first language. Names and
+        descriptions of the other languages come from their translated JSONB
+        values, read for all languages at once with one query per table.
+        Returns an empty dict when the POS config does not exist.
+        """
+        base_lang = langs[0]
+        pos_config = self.env['pos.config'].sudo().with_context(lang=base_lang).browse(pos_config_id)
+        if not pos_config.exists():
+            return {}
+
+        with stage('load_self_data'):
+            raw = pos_config.load_self_data()
+        cats = raw['pos.category']['data']
+        prods = [p for p in raw['product.product']['data'] if p.get('available_in_pos')]
+        with stage('image_versions'):
+            category_versions = self.env['pos.category'].sudo().browse([c['id'] for c in cats])._get_image_checksums()
+            product_versions = self._get_product_image_versions([p['id'] for p in prods])
+        with stage('compile'):
+            snapshots = {base_lang: self._compile_index(cats, prods, category_versions, product_versions)}
+        if len(langs) == 1:
+            return snapshots
+
+        with stage('translations'):
+            category_names, product_values = self._read_translations(
+                [c['id'] for c in cats], [p['id'] for p in prods])
+
+        def translate(values, lang):
+            return (values.get(lang) or values.get('en_US')) if values else None
+
+        for lang in langs[1:]:
+            lang_cats = [
+                dict(c, name=translate(category_names.get(c['id']), lang) or c['name'])
+                for c in cats
+            ]
+            lang_prods = []
+            for p in prods:
+                values = product_values.get(p['id'], {})
+                # display names may embed a default code or attribute values,
+                # only the template name part is translated
+                base_name = translate(values.get('name'), base_lang)
+                name = translate(values.get('name'), lang)
+                lang_prod = dict(p)
+                if base_name and name:
+                    lang_prod['display_name'] = p['display_name'].replace(base_name, name, 1)
+                if 'public_description' in values:
+                    lang_prod['public_description'] = translate(values['public_description'], lang) or False
+                lang_prods.append(lang_prod)
+            snapshots[lang] = self._compile_index(lang_cats, lang_prods, category_versions, product_versions)
+        return snapshots
+
+    @api.model
+    def _read_translations(self, category_ids, product_ids):
+        """Read the translated values of every language at once.
+
+        Returns ``(category_names, product_values)``: category id -> name
+        translations, and product id -> {field: translations} for the
+        template name and public description.
+        """
+        Template = self.env['product.template']
+        product_fields = [
+            fname for fname in ('name', 'public_description')
+            if fname in Template._fields and Template._fields[fname].translate
+        ]
+        self.env['pos.category'].flush_model(['name'])
+        Template.flush_model(product_fields)
+        self.env['product.product'].flush_model(['product_tmpl_id'])
+
+        category_names = {}
+        if category_ids:
+            self.env.cr.execute(
+                "SELECT id, name FROM pos_category WHERE id IN %s",
+                [tuple(category_ids)])
+            category_names = dict(self.env.cr.fetchall())
+
+        product_values = {}
+        if product_ids:
+            columns = ', '.join(f'pt.{fname}' for fname in product_fields)
+            self.env.cr.execute(f"""
+                SELECT pp.id, {columns}
+                  FROM product_product pp
+                  JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                 WHERE pp.id IN %s
+            """, [tuple(product_ids)])
+            product_values = {
+                row[0]: dict(zip(product_fields, row[1:]))
+                for row in self.env.cr.fetchall()
+            }
+        return category_names, product_values
+
+    @api.model
+    def _get_product_image_versions(self, product_ids):
+        """Image version token of each product, from the product and
+        template write dates (the image may be stored on either)."""
+        products = self.env['product.product'].sudo().browse(product_ids)
+        return {
+            p.id: image_unique(max(p.write_date, p.product_tmpl_id.write_date))
+            for p in products
+        }
+
+    @api.model
+    def _compile_index(self, cats, prods, category_versions, product_versions):
+        """Index the flat catalog so a menu level is served in time
+        proportional to its own size.
+
+        The returned snapshot holds:
+
+        * ``categories``: category id -> serialized category
+        * ``children``: parent id (None for roots) -> child category ids
+        * ``child_count``: category id -> number of child categories
+        * ``products``: product id -> serialized product
+        * ``category_products``: category id -> product ids
+        """
+        children = defaultdict(list)
+        for c in cats:
+            children[c.get('parent_id') or None].append(c['id'])
+        child_count = {parent: len(ids) for parent, ids in children.items() if parent}
+
+        categories = {}
+        for c in cats:
+            # build the image URLs only if the category has an image
+            img_url = img_srcset = None
+            unique = category_versions.get(c['id'])
+            if c.get('has_image') and unique:
+                img_url = image_url('pos.category', c['id'], unique[:12])
+                img_srcset = image_srcset('pos.category', c['id'], unique[:12])
+            categories[c['id']] = {
+                'id': c['id'],
+                'name': c['name'],
+                'has_more': bool(child_count.get(c['id'])),
+                'image_url': img_url,
+                'image_srcset': img_srcset,
+                'parent_id': c['parent_id'],
+            }
+
+        products = {}
+        category_products = defaultdict(list)
+        for p in prods:
+            products[p['id']] = {
+                'id': p['id'],
+                'name': p['display_name'],
+                'price': p['lst_price'],
+                'price_incl': p['list_price'],
+                'description': p['public_description'],
+                'image_url': image_url('product.product', p['id'], product_versions[p['id']]),
+                'image_srcset': image_srcset('product.product', p['id'], product_versions[p['id']]),
+            }
+            for categ_id in p.get('pos_categ_ids') or []:
+                category_products[categ_id].append(p['id'])
+
+        return {
+            'categories': categories,
+            'children': dict(children),
+            'child_count': child_count,
+            'products': products,
+            'category_products': dict(category_products),
+        }
+
+
+class PosMenuInvalidationMixin(models.AbstractModel):
+    _name = 'pos.menu.invalidation.mixin'
+    _description = 'Invalidate POS menu snapshots on changes'
+
+    # Fields shown in the menus, None when any field matters
+    _pos_menu_fields = None
+
+    def _is_pos_menu_change(self, vals):
+        return self._pos_menu_fields is None or not self._pos_menu_fields.isdisjoint(vals)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(self._is_pos_menu_change(vals) for vals in vals_list):
+            self.env['pos.menu.snapshot']._invalidate_snapshots()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._is_pos_menu_change(vals):
+            self.env['pos.menu.snapshot']._invalidate_snapshots()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['pos.menu.snapshot']._invalidate_snapshots()
+        return res
+
+    def _update_field_translations(self, field_name, translations, *args, **kwargs):
+        # translations edited from the UI do not go through write()
+        res = super()._update_field_translations(field_name, translations, *args, **kwargs)
+        if self._is_pos_menu_change([field_name]):
+            self.env['pos.menu.snapshot']._invalidate_snapshots()
+        return res
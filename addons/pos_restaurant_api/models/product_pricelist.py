@@ -0,0 +1,8 @@
+from odoo import models
+
+
+class ProductPricelist(models.Model):
+    _name = 'product.pricelist'
+    _inherit = ['product.pricelist', 'pos.menu.invalidation.mixin']
+
+    _pos_menu_fields = {'active', 'currency_id', 'company_id', 'item_ids'}
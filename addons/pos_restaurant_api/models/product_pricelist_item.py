@@ -0,0 +1,6 @@
+from odoo import models
+
+
+class ProductPricelistItem(models.Model):
+    _name = 'product.pricelist.item'
+    _inherit = ['product.pricelist.item', 'pos.menu.invalidation.mixin']
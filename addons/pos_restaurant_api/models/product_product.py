@@ -0,0 +1,14 @@
+from odoo import models
+
+
+class ProductProduct(models.Model):
+    _name = 'product.product'
+    _inherit = ['product.product', 'pos.menu.invalidation.mixin']
+
+    # template fields written through the variants are included
+    _pos_menu_fields = {
+        'name', 'active', 'available_in_pos', 'pos_categ_ids', 'list_price',
+        'lst_price', 'taxes_id', 'default_code', 'description_sale',
+        'public_description', 'image_1920', 'image_variant_1920',
+        'product_template_attribute_value_ids',
+    }
@@ -0,0 +1,12 @@
+from odoo import models
+
+
+class ProductTemplate(models.Model):
+    _name = 'product.template'
+    _inherit = ['product.template', 'pos.menu.invalidation.mixin']
+
+    _pos_menu_fields = {
+        'name', 'active', 'available_in_pos', 'pos_categ_ids', 'list_price',
+        'taxes_id', 'default_code', 'description_sale', 'public_description',
+        'image_1920', 'attribute_line_ids', 'pos_sequence',
+    }
@@ -0,0 +1,8 @@
+from odoo import models
+
+
+class ResLang(models.Model):
+    _name = 'res.lang'
+    _inherit = ['res.lang', 'pos.menu.invalidation.mixin']
+
+    _pos_menu_fields = {'active', 'name', 'code', 'flag_image'}
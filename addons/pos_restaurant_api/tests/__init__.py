@@ -0,0 +1 @@
+from . import test_menu_benchmark
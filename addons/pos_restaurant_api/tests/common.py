@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import statistics
+import time
+import tracemalloc
+
+from odoo import fields, release, sql_db
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+# Benchmarks only run when selected, e.g. ``--test-tags pos_bench``
+BENCH_TAG = 'pos_bench'
+
+
+def bench_output_path():
+    """NDJSON file the results are appended to, POS_BENCH_OUTPUT or the
+    data directory."""
+    return os.environ.get('POS_BENCH_OUTPUT') or os.path.join(
+        config['data_dir'], 'pos_benchmarks', 'results.ndjson')
+
+
+class BenchmarkMixin:
+    """Measure wall time, SQL queries and peak Python memory of a callable.
+
+    Every measure is timed over `bench_repeat` runs, then run once more
+    under tracemalloc for the memory peak, so tracing does not skew the
+    timings. Results of the class are appended to `bench_output_path()`
+    as one JSON object per line, tagged with POS_BENCH_REVISION, so runs
+    of different commits can be compared.
+    """
+    bench_repeat = int(os.environ.get('POS_BENCH_REPEAT', 5))
+    # data sizes by scale name, pick some with POS_BENCH_SCALES=small,medium
+    bench_scales = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.bench_results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.bench_results:
+            path = bench_output_path()
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a') as f:
+                for result in cls.bench_results:
+                    f.write(json.dumps(result) + '\n')
+            _logger.info("%s benchmark results written to %s", len(cls.bench_results), path)
+        super().tearDownClass()
+
+    def bench_scale(self, scale):
+        """Return the sizes of `scale`, skipping it unless selected."""
+        selected = os.environ.get('POS_BENCH_SCALES')
+        if selected and scale not in selected.split(','):
+            self.skipTest(f"benchmark scale {scale} not selected")
+        return self.bench_scales[scale]
+
+    def measure(self, name, func, scale=None, setup=None, repeat=None):
+        """Run `func` and record its cost under `name`.
+
+        `setup` runs before every run, outside of the measure, e.g. to
+        drop a cache for cold measures. Returns the last result of `func`.
+        """
+        timings = []
+        queries = []
+        for _i in range(repeat or self.bench_repeat):
+            if setup:
+                setup()
+            self.env.flush_all()
+            self.env.invalidate_all()
+            count = sql_db.sql_counter
+            start = time.perf_counter()
+            result = func()
+            self.env.flush_all()
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(sql_db.sql_counter - count)
+
+        if setup:
+            setup()
+        self.env.invalidate_all()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func()
+        self.env.flush_all()
+        peak = tracemalloc.get_traced_memory()[1] - base
+        if not tracing:
+            tracemalloc.stop()
+
+        result_values = {
+            'module': self.test_module,
+            'benchmark': name,
+            'scale': scale,
+            'runs': len(timings),
+            'wall_ms': {
+                'min': round(min(timings), 3),
+                'median': round(statistics.median(timings), 3),
+                'max': round(max(timings), 3),
+            },
+            'queries': max(queries),
+            'peak_kib': round(peak / 1024, 1),
+            'revision': os.environ.get('POS_BENCH_REVISION'),
+            'odoo_version': release.version,
+            'date': fields.Datetime.to_string(fields.Datetime.now()),
+        }
+        self.bench_results.append(result_values)
+        _logger.info("benchmark %s [%s]: %.1f ms, %s queries, %.1f KiB",
+                     name, scale, result_values['wall_ms']['median'],
+                     result_values['queries'], result_values['peak_kib'])
+        return result
@@ -0,0 +1,95 @@
+import random
+
+from odoo import Command
+from odoo.tests import HttpCase, tagged
+
+from odoo.addons.pos_restaurant_api.tests.common import BENCH_TAG, BenchmarkMixin
+
+CREATE_BATCH_SIZE = 1000
+
+
+@tagged(BENCH_TAG, '-standard', '-at_install', 'post_install')
+class TestMenuBenchmark(BenchmarkMixin, HttpCase):
+    """Cost of the menu API on synthetic catalogs, run with
+    ``--test-tags pos_bench``."""
+    # (categories, products)
+    bench_scales = {
+        'small': (100, 1000),
+        'medium': (1000, 10000),
+        'large': (5000, 50000),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pos_config = cls.env['pos.config'].create({'name': 'Benchmark'})
+
+    def _generate_catalog(self, category_count, product_count):
+        """Create a category tree a few levels deep and products spread
+        over one or two categories, reproducibly."""
+        rng = random.Random(category_count * 100003 + product_count)
+        categories = self.env['pos.category'].create([
+            {'name': f'Bench category {i}'} for i in range(max(1, category_count // 20))
+        ])
+        while len(categories) < category_count:
+            parent_ids = categories.ids
+            size = min(CREATE_BATCH_SIZE, category_count - len(categories))
+            categories |= self.env['pos.category'].create([{
+                'name': f'Bench category {len(categories) + i}',
+                'parent_id': rng.choice(parent_ids),
+            } for i in range(size)])
+
+        category_ids = categories.ids
+        for start in range(0, product_count, CREATE_BATCH_SIZE):
+            self.env['product.template'].create([{
+                'name': f'Bench product {i}',
+                'list_price': rng.randint(100, 5000) / 100,
+                'available_in_pos': True,
+                'pos_categ_ids': [Command.set(rng.sample(category_ids, min(len(category_ids), rng.randint(1, 2))))],
+            } for i in range(start, min(start + CREATE_BATCH_SIZE, product_count))])
+            self.env.flush_all()
+        return categories
+
+    def _rpc(self, route, **params):
+        result = self.make_jsonrpc_request(route, params)
+        self.assertNotIn('error', result)
+        return result
+
+    def _bump_catalog_version(self):
+        self.env['pos.menu.snapshot']._bump_catalog_version()
+
+    def _bench_menu(self, scale):
+        category_count, product_count = self.bench_scale(scale)
+        categories = self._generate_catalog(category_count, product_count)
+        # a category with products, deep enough to be representative
+        category = categories[-1].parent_id or categories[-1]
+        config_id = self.pos_config.id
+
+        self.measure('_build_category_tree', lambda: self._rpc(
+            '/api/v1/pos-menu-tree', pos_config_id=config_id), scale, repeat=1)
+        if not hasattr(self.pos_config, 'load_self_data'):
+            self.skipTest("get_pos_menu builds on load_self_data, install pos_self_order")
+
+        self.measure('get_pos_menu.cold', lambda: self._rpc(
+            '/api/v1/pos-menu', pos_config_id=config_id), scale, setup=self._bump_catalog_version)
+        root = self.measure('get_pos_menu.root', lambda: self._rpc(
+            '/api/v1/pos-menu', pos_config_id=config_id), scale)
+        self.measure('get_pos_menu.category', lambda: self._rpc(
+            '/api/v1/pos-menu', pos_config_id=config_id, category_id=category.id), scale)
+        self.measure('get_pos_menu.not_modified', lambda: self._rpc(
+            '/api/v1/pos-menu', pos_config_id=config_id, known_version=root['version']), scale)
+
+    def test_menu_small(self):
+        self._bench_menu('small')
+
+    def test_menu_medium(self):
+        self._bench_menu('medium')
+
+    def test_menu_large(self):
+        self._bench_menu('large')
+
+    def test_languages(self):
+        languages = self.measure('get_pos_languages', lambda: self._rpc(
+            '/api/v1/pos-menu-languages'))
+        self.measure('get_pos_languages.not_modified', lambda: self._rpc(
+            '/api/v1/pos-menu-languages', known_version=languages['version']))